@@ -0,0 +1,77 @@
+import logging
+import time
+from functools import lru_cache
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryScheduler:
+    """
+    Tracks reservation deadlines in a Redis sorted set (cart item id scored by
+    expiry timestamp) so due holds are released as they come due, without
+    scanning CartItem. ``release_expired_reservations`` remains the safety net
+    for anything the scheduler missed.
+    """
+
+    KEY = "reservations:expiry"
+
+    def __init__(self, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(settings.RESERVATION_EXPIRY_REDIS_URL, decode_responses=True)
+        self.client = client
+
+    def schedule(self, items):
+        self.client.zadd(self.KEY, {
+            str(item.id): item.reservation_expires_at.timestamp() for item in items
+        })
+
+    def claim_due(self, now=None, limit=500):
+        """Pop up to ``limit`` due item ids; concurrent runners never share one."""
+        now = time.time() if now is None else now
+        due = self.client.zrangebyscore(self.KEY, "-inf", now, start=0, num=limit)
+        if not due:
+            return []
+        pipe = self.client.pipeline()
+        for item_id in due:
+            pipe.zrem(self.KEY, item_id)
+        return [int(item_id) for item_id, removed in zip(due, pipe.execute()) if removed]
+
+    def release_due(self, now=None, limit=500):
+        from .services import release_cart_items
+
+        claimed = self.claim_due(now=now, limit=limit)
+        if not claimed:
+            return 0
+        return release_cart_items(claimed)
+
+    def run(self, poll_interval=0.25, limit=500):
+        while True:
+            try:
+                # Full batches mean a backlog, so keep draining without sleeping.
+                if self.release_due(limit=limit) >= limit:
+                    continue
+            except Exception:
+                # Claimed ids that failed are picked up by the scan-based sweep.
+                logger.exception("Reservation expiry batch failed")
+            time.sleep(poll_interval)
+
+
+def scheduler_enabled():
+    return settings.RESERVATION_EXPIRY_SCHEDULER
+
+
+@lru_cache(maxsize=None)
+def get_expiry_scheduler():
+    return ExpiryScheduler()
+
+
+def schedule(items):
+    from redis import RedisError
+
+    try:
+        get_expiry_scheduler().schedule(items)
+    except RedisError:
+        # The scan in release_expired_reservations still releases these holds.
+        logger.warning("Could not schedule reservation expiry", exc_info=True)
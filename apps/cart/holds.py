@@ -0,0 +1,156 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction, DatabaseError
+from django.utils import timezone
+from apps.inventory.services import release_stock_many
+from .models import CartItem, ReservationHold
+
+TABLE = ReservationHold._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+NAME_FORMAT = "%Y%m%d%H%M"
+
+
+def partitioning_enabled():
+    return settings.RESERVATION_HOLDS_PARTITIONED
+
+
+def _interval():
+    return timedelta(minutes=settings.RESERVATION_HOLD_PARTITION_MINUTES)
+
+
+def partition_start(moment):
+    minutes = settings.RESERVATION_HOLD_PARTITION_MINUTES
+    moment = moment.astimezone(dt_timezone.utc)
+    return moment.replace(minute=moment.minute - moment.minute % minutes, second=0, microsecond=0)
+
+
+def partition_name(start, end):
+    return f"{TABLE}_{start:{NAME_FORMAT}}_{end:{NAME_FORMAT}}"
+
+
+def partitions():
+    """Return ``[(name, start, end)]`` for every range partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass AND c.relname <> %s
+            """,
+            [TABLE, DEFAULT_PARTITION],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    result = []
+    for name in names:
+        start, end = name[len(TABLE) + 1:].split("_")
+        result.append((
+            name,
+            datetime.strptime(start, NAME_FORMAT).replace(tzinfo=dt_timezone.utc),
+            datetime.strptime(end, NAME_FORMAT).replace(tzinfo=dt_timezone.utc),
+        ))
+    return sorted(result, key=lambda partition: partition[1])
+
+
+def ensure_partitions(now=None, ahead=None):
+    """Create the partitions covering ``now`` and the next ``ahead`` intervals."""
+    now = now or timezone.now()
+    ahead = settings.RESERVATION_HOLD_PARTITIONS_AHEAD if ahead is None else ahead
+    existing = {name for name, _, _ in partitions()}
+    start = partition_start(now)
+    created = 0
+    for _ in range(ahead + 1):
+        end = start + _interval()
+        name = partition_name(start, end)
+        if name not in existing:
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(
+                        f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)",
+                        [start, end],
+                    )
+                created += 1
+            except DatabaseError:
+                # Rows for this range already sit in the default partition
+                # (or another worker created it); they expire from there.
+                pass
+        start = end
+    return created
+
+
+def add_holds(items):
+    ReservationHold.objects.bulk_create([
+        ReservationHold(
+            cart_item_id=item.id,
+            variant_id=item.variant_id,
+            quantity=item.quantity,
+            reservation_expires_at=item.reservation_expires_at,
+        )
+        for item in items
+    ])
+
+
+def lock(cart_item_ids):
+    """Lock the holds of the given cart items and return the ids still held."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT cart_item_id FROM {TABLE} WHERE cart_item_id = ANY(%s) FOR UPDATE",
+            [list(cart_item_ids)],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def consume(cart_item_ids):
+    """Delete the holds of cart items being checked out; return the ids found."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {TABLE} WHERE cart_item_id = ANY(%s) RETURNING cart_item_id",
+            [list(cart_item_ids)],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _release(rows):
+    totals = defaultdict(int)
+    cart_item_ids = []
+    for variant_id, quantity, cart_item_id in rows:
+        totals[variant_id] += quantity
+        cart_item_ids.append(cart_item_id)
+    release_stock_many(totals)
+    CartItem.objects.filter(id__in=cart_item_ids).delete()
+    return len(cart_item_ids)
+
+
+def release_expired(now=None):
+    """
+    Release the stock of every partition whose range has fully expired, then
+    detach and drop it. Stock is released per partition with one aggregated UPDATE, so
+    the cost follows the number of partitions, not the number of holds.
+    Returns the number of holds released.
+    """
+    now = now or timezone.now()
+    released = 0
+    for name, _, end in partitions():
+        if end > now:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Waits for checkouts still consuming holds in this partition.
+            # Detaching locks the parent before the partition, the order
+            # add_holds, lock and consume take them in.
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            cursor.execute(f"SELECT variant_id, quantity, cart_item_id FROM {name}")
+            released += _release(cursor.fetchall())
+            cursor.execute(f"DROP TABLE {name}")
+
+    # Holds that landed in the default partition expire row by row.
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM {DEFAULT_PARTITION} WHERE reservation_expires_at < %s
+            RETURNING variant_id, quantity, cart_item_id
+            """,
+            [now],
+        )
+        released += _release(cursor.fetchall())
+    return released
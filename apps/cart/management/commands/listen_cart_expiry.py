@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.cart.stores import RedisCartStore, get_cart_store
+
+
+class Command(BaseCommand):
+    help = "Release reserved stock as Redis carts expire (keyspace notifications)."
+
+    def handle(self, *args, **options):
+        store = get_cart_store()
+        if not isinstance(store, RedisCartStore):
+            raise CommandError("CART_STORE is not 'redis'; nothing to listen for.")
+
+        self.stdout.write("Listening for expired carts...")
+        store.listen_for_expired_carts()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.cart.expiry import get_expiry_scheduler
+
+
+class Command(BaseCommand):
+    help = "Release reservation holds as they come due, from the Redis expiry schedule."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=0.25)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Releasing due reservations...")
+        get_expiry_scheduler().run(poll_interval=options["poll_interval"], limit=options["batch_size"])
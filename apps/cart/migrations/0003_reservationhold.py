@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_checkoutjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cart_item_id', models.BigIntegerField()),
+                ('variant_id', models.BigIntegerField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('reservation_expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'cart_reservationhold',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE TABLE cart_reservationhold (
+                id bigserial,
+                cart_item_id bigint NOT NULL,
+                variant_id bigint NOT NULL,
+                quantity integer NOT NULL CHECK (quantity >= 0),
+                reservation_expires_at timestamp with time zone NOT NULL,
+                PRIMARY KEY (id, reservation_expires_at)
+            ) PARTITION BY RANGE (reservation_expires_at);
+            CREATE INDEX cart_reservationhold_cart_item ON cart_reservationhold (cart_item_id);
+            CREATE TABLE cart_reservationhold_default PARTITION OF cart_reservationhold DEFAULT;
+            """,
+            reverse_sql="DROP TABLE cart_reservationhold;",
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:53
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes to the hot tables.
+    atomic = False
+
+    dependencies = [
+        ('cart', '0003_reservationhold'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='cart',
+            index=models.Index(fields=['user_id', 'status'], name='cart_user_status'),
+        ),
+        AddIndexConcurrently(
+            model_name='cartitem',
+            index=models.Index(fields=['reservation_expires_at'], name='cartitem_expires_at'),
+        ),
+        AddIndexConcurrently(
+            model_name='checkoutjob',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['id'], name='checkoutjob_pending'),
+        ),
+    ]
@@ -5,9 +5,52 @@ class Cart(models.Model):
     user_id = models.IntegerField()
     status = models.CharField(max_length=20, default="ACTIVE")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_id", "status"], name="cart_user_status"),
+        ]
+
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, related_name="items", on_delete=models.CASCADE)
     variant = models.ForeignKey(Variant, on_delete=models.PROTECT)
     quantity = models.PositiveIntegerField()
     price_snapshot = models.DecimalField(max_digits=10, decimal_places=2)
     reservation_expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Expired-reservation sweeps.
+            models.Index(fields=["reservation_expires_at"], name="cartitem_expires_at"),
+        ]
+
+class CheckoutJob(models.Model):
+    STATUS = (
+        ("PENDING", "Pending"),
+        ("ACCEPTED", "Accepted"),
+        ("REJECTED", "Rejected"),
+    )
+
+    cart = models.ForeignKey(Cart, related_name="checkout_jobs", null=True, on_delete=models.SET_NULL)
+    user_id = models.IntegerField()
+    status = models.CharField(max_length=20, choices=STATUS, default="PENDING")
+    error = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # process_checkout_group takes the oldest pending jobs.
+            models.Index(fields=["id"], condition=models.Q(status="PENDING"), name="checkoutjob_pending"),
+        ]
+
+class ReservationHold(models.Model):
+    # Range-partitioned by reservation_expires_at; the table and its
+    # partitions are managed by migrations and apps.cart.holds.
+    cart_item_id = models.BigIntegerField()
+    variant_id = models.BigIntegerField()
+    quantity = models.PositiveIntegerField()
+    reservation_expires_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "cart_reservationhold"
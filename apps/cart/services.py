@@ -1,46 +1,226 @@
+from collections import defaultdict
+from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
-from django.db import transaction
-from apps.inventory.services import reserve_stock
-from .models import CartItem
+from django.db import connection, transaction
+from django.db.models import Q
+from apps.inventory import ledger
+from apps.inventory.events import notify_availability
+from apps.inventory.services import lock_inventory, release_stock_many, reserve_stock
+from .models import Cart, CartItem, CheckoutJob
+from . import expiry, holds
+
+RESERVATION_TTL = timedelta(minutes=15)
 
 def add_to_cart(cart, variant, quantity, price):
     reserve_stock(variant.id, quantity)
+    add_reserved_item(cart, variant, quantity, price)
 
-    CartItem.objects.create(
-        cart=cart,
-        variant=variant,
-        quantity=quantity,
-        price_snapshot=price,
-        reservation_expires_at=timezone.now() + timedelta(minutes=15)
-    )
+def add_reserved_item(cart, variant, quantity, price):
+    """Add a line whose stock the caller has already reserved."""
+    with transaction.atomic():
+        item = CartItem.objects.create(
+            cart=cart,
+            variant=variant,
+            quantity=quantity,
+            price_snapshot=price,
+            reservation_expires_at=timezone.now() + RESERVATION_TTL
+        )
+        if holds.partitioning_enabled():
+            holds.add_holds([item])
+        elif expiry.scheduler_enabled():
+            transaction.on_commit(lambda: expiry.schedule([item]))
 
 def checkout(cart):
+    from apps.inventory.models import Inventory, InventoryMovement
+
     with transaction.atomic():
-        items = CartItem.objects.select_related("variant").filter(cart=cart)
-        
-        if not items.exists():
+        items = list(CartItem.objects.select_related("variant").filter(cart=cart))
+
+        if not items:
             raise ValueError("Cart is empty")
-            
-        # 1. Lock and validate inventory for all items
+
+        if holds.partitioning_enabled():
+            held = holds.consume([item.id for item in items])
+            for item in items:
+                if item.id not in held:
+                    raise ValueError(f"Reservation expired for {item.variant.sku}")
+
+        wanted = defaultdict(int)
+        for item in items:
+            wanted[item.variant_id] += item.quantity
+        variant_ids = sorted(wanted)
+
+        # 1. Lock and validate inventory for all items, in variant order
+        # (the order every other stock writer locks in).
+        if ledger.ledger_enabled():
+            ledger.lock_variants(variant_ids)
+            levels = ledger.stock_levels(variant_ids)
+        else:
+            inventories = {
+                inventory.variant_id: inventory
+                for inventory in Inventory.objects.select_for_update()
+                .filter(variant_id__in=variant_ids)
+                .order_by("variant_id")
+            }
+            levels = {
+                variant_id: [inventory.stock_quantity, inventory.reserved_quantity]
+                for variant_id, inventory in inventories.items()
+            }
+
         for item in items:
-            # We use select_for_update inside the inventory service or raw here.
-            # Ideally we reuse a service method that supports locking, or do it explicitly here 
-            # to ensure we lock all relevant rows.
-            # Let's use the Inventory model directly to lock.
-            from apps.inventory.models import Inventory
-            
-            inventory = Inventory.objects.select_for_update().get(variant=item.variant)
-            
-            if inventory.stock_quantity < item.quantity:
+            if item.variant_id not in levels:
+                raise Inventory.DoesNotExist(f"No inventory for {item.variant.sku}")
+            if levels[item.variant_id][0] < wanted[item.variant_id]:
                 raise ValueError(f"Insufficient stock for {item.variant.sku}")
-                
-            # 2. Update inventory (Permanent deduction)
-            inventory.stock_quantity -= item.quantity
-            inventory.reserved_quantity -= item.quantity
-            inventory.save()
-            
+
+        # 2. Update inventory (Permanent deduction)
+        if ledger.ledger_enabled():
+            InventoryMovement.objects.bulk_create([
+                ledger.movement(variant_id, "SALE", qty) for variant_id, qty in wanted.items()
+            ])
+        else:
+            for variant_id, qty in wanted.items():
+                inventories[variant_id].stock_quantity -= qty
+                inventories[variant_id].reserved_quantity -= qty
+            Inventory.objects.bulk_update(inventories.values(), ["stock_quantity", "reserved_quantity"])
+
+        notify_availability(variant_ids)
+
         # 3. Clear cart
-        items.delete()
+        CartItem.objects.filter(cart=cart).delete()
         cart.delete()
 
+def release_cart_items(item_ids):
+    """
+    Delete the given cart items and release their reserved stock in one pass.
+
+    Items that are already gone (checked out or released by another sweeper)
+    are skipped, so callers may race. Returns the number of items released.
+    """
+    with transaction.atomic():
+        variant_ids = set(CartItem.objects.filter(id__in=item_ids).values_list("variant_id", flat=True))
+        if not variant_ids:
+            return 0
+        # Same lock order as checkout: Inventory rows first, then the items.
+        lock_inventory(variant_ids)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {CartItem._meta.db_table} WHERE id = ANY(%s) RETURNING variant_id, quantity",
+                [list(item_ids)],
+            )
+            rows = cursor.fetchall()
+
+        released = defaultdict(int)
+        for variant_id, quantity in rows:
+            released[variant_id] += quantity
+        release_stock_many(released)
+        return len(rows)
+
+def process_checkout_group(limit=None):
+    """
+    Commit a group of pending checkout jobs in one transaction.
+
+    The oldest pending job picks the hot variants; pending jobs whose carts
+    touch those variants join the group (up to ``limit``). Inventory rows are
+    locked once, in variant order, and each job is accepted or rejected in
+    arrival order against the stock that is left; later jobs for a cart
+    already in the group are rejected. Returns the number of jobs processed.
+    """
+    limit = limit or settings.CHECKOUT_GROUP_SIZE
+    from apps.inventory.models import Inventory, InventoryMovement
+
+    with transaction.atomic():
+        pending = CheckoutJob.objects.select_for_update(skip_locked=True).filter(status="PENDING")
+        head = pending.order_by("id").first()
+        if head is None:
+            return 0
+
+        hot_variants = CartItem.objects.filter(cart_id=head.cart_id).values("variant_id")
+        joining = CheckoutJob.objects.filter(
+            status="PENDING", cart__items__variant_id__in=hot_variants
+        ).values("id")
+        jobs = list(pending.filter(Q(id=head.id) | Q(id__in=joining)).order_by("id")[:limit])
+
+        lines = defaultdict(list)
+        for item in CartItem.objects.select_related("variant").filter(
+            cart_id__in=[job.cart_id for job in jobs if job.cart_id]
+        ):
+            lines[item.cart_id].append(item)
+        if holds.partitioning_enabled():
+            held = holds.lock([item.id for items in lines.values() for item in items])
+
+        variant_ids = sorted({item.variant_id for items in lines.values() for item in items})
+        if ledger.ledger_enabled():
+            ledger.lock_variants(variant_ids)
+            levels = ledger.stock_levels(variant_ids)
+        else:
+            inventories = {
+                inventory.variant_id: inventory
+                for inventory in Inventory.objects.select_for_update()
+                .filter(variant_id__in=variant_ids)
+                .order_by("variant_id")
+            }
+            levels = {
+                variant_id: [inventory.stock_quantity, inventory.reserved_quantity]
+                for variant_id, inventory in inventories.items()
+            }
+
+        now = timezone.now()
+        accepted_carts = []
+        seen_carts = set()
+        sold = defaultdict(int)
+        for job in jobs:
+            job.processed_at = now
+            if job.cart_id in seen_carts:
+                job.status, job.error = "REJECTED", "Duplicate checkout for this cart"
+                continue
+            seen_carts.add(job.cart_id)
+            items = lines.get(job.cart_id)
+            if not items:
+                job.status, job.error = "REJECTED", "Cart is empty"
+                continue
+
+            wanted = defaultdict(int)
+            for item in items:
+                wanted[item.variant_id] += item.quantity
+            short = [
+                item.variant.sku for item in items
+                if item.variant_id not in levels
+                or levels[item.variant_id][0] < wanted[item.variant_id]
+            ]
+            if short:
+                job.status, job.error = "REJECTED", f"Insufficient stock for {short[0]}"
+                continue
+            if holds.partitioning_enabled():
+                expired = [item.variant.sku for item in items if item.id not in held]
+                if expired:
+                    job.status, job.error = "REJECTED", f"Reservation expired for {expired[0]}"
+                    continue
+
+            for variant_id, qty in wanted.items():
+                levels[variant_id][0] -= qty
+                levels[variant_id][1] -= qty
+                sold[variant_id] += qty
+            job.status = "ACCEPTED"
+            accepted_carts.append(job.cart_id)
+
+        if ledger.ledger_enabled():
+            InventoryMovement.objects.bulk_create([
+                ledger.movement(variant_id, "SALE", qty) for variant_id, qty in sold.items()
+            ])
+        else:
+            for variant_id in sold:
+                inventories[variant_id].stock_quantity, inventories[variant_id].reserved_quantity = levels[variant_id]
+            Inventory.objects.bulk_update(
+                [inventories[variant_id] for variant_id in sold], ["stock_quantity", "reserved_quantity"]
+            )
+        notify_availability(sold)
+        if holds.partitioning_enabled():
+            holds.consume([item.id for cart_id in accepted_carts for item in lines[cart_id]])
+        CheckoutJob.objects.bulk_update(jobs, ["status", "error", "processed_at"])
+        CartItem.objects.filter(cart_id__in=accepted_carts).delete()
+        Cart.objects.filter(id__in=accepted_carts).delete()
+
+    return len(jobs)
+
@@ -0,0 +1,227 @@
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from apps.inventory.services import release_stock, reserve_stock
+from .models import Cart, CartItem
+from . import holds
+from .services import RESERVATION_TTL, add_to_cart, checkout
+
+
+class DatabaseCartStore:
+    """Active carts live in the Cart/CartItem tables from the first add."""
+
+    def add(self, user_id, variant, quantity, price):
+        cart, _ = Cart.objects.get_or_create(user_id=user_id)
+        add_to_cart(cart, variant, quantity, price)
+
+    def get_checkout_cart(self, user_id):
+        return Cart.objects.get(user_id=user_id)
+
+    def checkout(self, user_id):
+        checkout(self.get_checkout_cart(user_id))
+
+    def release_expired(self, now=None):
+        # Expired CartItems are released by release_expired_reservations.
+        return 0
+
+
+class RedisCartStore:
+    """
+    Active carts live in Redis and only reach Postgres at checkout.
+
+    ``cart:<user_id>`` is the cart hash and carries the reservation TTL
+    (refreshed on every add). ``cart:<user_id>:held`` mirrors it without a
+    TTL so the stock that is still reserved can be released after the cart
+    key has expired, and ``cart:expiry`` indexes users by expiry time for
+    the sweeper.
+    """
+
+    EXPIRY_INDEX = "cart:expiry"
+
+    def __init__(self, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(settings.CART_REDIS_URL, decode_responses=True)
+        self.client = client
+        self.ttl = int(RESERVATION_TTL.total_seconds())
+
+    def _cart_key(self, user_id):
+        return f"cart:{user_id}"
+
+    def _held_key(self, user_id):
+        return f"cart:{user_id}:held"
+
+    def add(self, user_id, variant, quantity, price):
+        key = self._cart_key(user_id)
+        if not self.client.exists(key):
+            # Stock from a cart that expired but was not swept yet.
+            self.release_user(user_id)
+
+        reserve_stock(variant.id, quantity)
+
+        expires_at = time.time() + self.ttl
+        line = json.dumps({
+            "variant_id": variant.id,
+            "quantity": int(quantity),
+            "price": str(price),
+            "expires_at": expires_at,
+        })
+        try:
+            field = f"item:{self.client.hincrby(self._held_key(user_id), 'seq', 1)}"
+            pipe = self.client.pipeline()
+            pipe.hset(key, field, line)
+            pipe.hset(self._held_key(user_id), field, line)
+            pipe.expire(key, self.ttl)
+            pipe.zadd(self.EXPIRY_INDEX, {str(user_id): expires_at})
+            pipe.execute()
+        except Exception:
+            release_stock(variant.id, quantity)
+            raise
+
+    def _claim(self, user_id, due_before=None):
+        """
+        Atomically take the held lines of a cart out of Redis.
+
+        Returns ``(live, lines)``; ``live`` is False when the cart key had
+        already expired. Returns None when ``due_before`` is given and the
+        cart is not due yet.
+        """
+        from redis import WatchError
+
+        key = self._cart_key(user_id)
+        held_key = self._held_key(user_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key, held_key)
+                    if due_before is not None:
+                        score = pipe.zscore(self.EXPIRY_INDEX, str(user_id))
+                        if score is not None and score > due_before:
+                            pipe.unwatch()
+                            return None
+                    live = bool(pipe.exists(key))
+                    held = pipe.hgetall(held_key)
+                    pipe.multi()
+                    pipe.delete(key, held_key)
+                    pipe.zrem(self.EXPIRY_INDEX, str(user_id))
+                    pipe.execute()
+                    break
+                except WatchError:
+                    continue
+
+        lines = [json.loads(value) for field, value in held.items() if field != "seq"]
+        return live, lines
+
+    def _restore(self, user_id, lines):
+        key = self._cart_key(user_id)
+        held_key = self._held_key(user_id)
+        expires_at = max(line["expires_at"] for line in lines)
+        pipe = self.client.pipeline()
+        for i, line in enumerate(lines, start=1):
+            pipe.hset(key, f"item:{i}", json.dumps(line))
+            pipe.hset(held_key, f"item:{i}", json.dumps(line))
+        pipe.hset(held_key, "seq", len(lines))
+        pipe.expire(key, max(int(expires_at - time.time()), 1))
+        pipe.zadd(self.EXPIRY_INDEX, {str(user_id): expires_at})
+        pipe.execute()
+
+    def _release_lines(self, lines):
+        for line in lines:
+            release_stock(line["variant_id"], line["quantity"])
+
+    def release_user(self, user_id, due_before=None):
+        claimed = self._claim(user_id, due_before=due_before)
+        if not claimed:
+            return 0
+        _, lines = claimed
+        self._release_lines(lines)
+        return len(lines)
+
+    def _persist(self, user_id, lines):
+        cart = Cart.objects.create(user_id=user_id)
+        items = CartItem.objects.bulk_create([
+            CartItem(
+                cart=cart,
+                variant_id=line["variant_id"],
+                quantity=line["quantity"],
+                price_snapshot=Decimal(line["price"]),
+                reservation_expires_at=datetime.fromtimestamp(line["expires_at"], tz=dt_timezone.utc),
+            )
+            for line in lines
+        ])
+        if holds.partitioning_enabled():
+            holds.add_holds(items)
+        return cart
+
+    def _claim_for_checkout(self, user_id):
+        claimed = self._claim(user_id)
+        if claimed is None:
+            raise Cart.DoesNotExist
+        live, lines = claimed
+        if not live:
+            self._release_lines(lines)
+            lines = []
+        if not lines:
+            raise Cart.DoesNotExist
+        return lines
+
+    def get_checkout_cart(self, user_id):
+        lines = self._claim_for_checkout(user_id)
+        try:
+            with transaction.atomic():
+                return self._persist(user_id, lines)
+        except Exception:
+            self._restore(user_id, lines)
+            raise
+
+    def checkout(self, user_id):
+        lines = self._claim_for_checkout(user_id)
+        try:
+            with transaction.atomic():
+                checkout(self._persist(user_id, lines))
+        except Exception:
+            self._restore(user_id, lines)
+            raise
+
+    def release_expired(self, now=None):
+        now = time.time() if now is None else now
+        released = 0
+        for user_id in self.client.zrangebyscore(self.EXPIRY_INDEX, "-inf", now):
+            released += self.release_user(user_id, due_before=now)
+        return released
+
+    def listen_for_expired_carts(self):
+        """Release stock as soon as Redis reports an expired cart key."""
+        db = self.client.connection_pool.connection_kwargs.get("db", 0)
+        try:
+            self.client.config_set("notify-keyspace-events", "Ex")
+        except Exception:
+            # Managed Redis may forbid CONFIG; it then has to be set server side.
+            pass
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(f"__keyevent@{db}__:expired")
+        for message in pubsub.listen():
+            key = message["data"]
+            if key.startswith("cart:") and key.count(":") == 1:
+                self.release_user(key.split(":", 1)[1])
+
+
+CART_STORES = {
+    "database": DatabaseCartStore,
+    "redis": RedisCartStore,
+}
+
+
+@lru_cache(maxsize=None)
+def _build_store(name):
+    return CART_STORES[name]()
+
+
+def get_cart_store():
+    return _build_store(settings.CART_STORE)
@@ -0,0 +1,20 @@
+from celery import shared_task # type: ignore
+import config.celery # noqa: F401  (binds the shared tasks to the project app)
+from .services import process_checkout_group
+from . import holds
+
+@shared_task
+def process_checkout_jobs():
+    processed = 0
+    while True:
+        count = process_checkout_group()
+        if not count:
+            return processed
+        processed += count
+
+@shared_task
+def maintain_reservation_partitions():
+    if not holds.partitioning_enabled():
+        return 0
+    holds.ensure_partitions()
+    return holds.release_expired()
@@ -0,0 +1,58 @@
+import pytest
+from decimal import Decimal
+from apps.cart.models import Cart, CartItem
+from apps.cart.services import add_to_cart, checkout
+from apps.inventory import ledger
+from apps.inventory.models import Inventory, InventoryMovement
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+pytestmark = pytest.mark.django_db
+
+def setup_variants(count, stock=10):
+    category = Category.objects.create(name="Clothing")
+    product = Product.objects.create(name="T-Shirt", description="", base_price=500, status="active", category=category)
+    variants = [Variant.objects.create(product=product, sku=f"TSHIRT-{i}", attributes={}) for i in range(count)]
+    Inventory.objects.bulk_create([Inventory(variant=variant, stock_quantity=stock) for variant in variants])
+    return variants
+
+def test_lines_of_one_variant_are_deducted_together():
+    variant, = setup_variants(1)
+    cart = Cart.objects.create(user_id=1)
+    add_to_cart(cart, variant, 2, Decimal("500.00"))
+    add_to_cart(cart, variant, 3, Decimal("500.00"))
+
+    checkout(cart)
+
+    inventory = Inventory.objects.get(variant=variant)
+    assert (inventory.stock_quantity, inventory.reserved_quantity) == (5, 0)
+    assert not CartItem.objects.exists()
+
+def test_combined_shortfall_rolls_back():
+    variant, = setup_variants(1, stock=4)
+    cart = Cart.objects.create(user_id=1)
+    add_to_cart(cart, variant, 2, Decimal("500.00"))
+    add_to_cart(cart, variant, 2, Decimal("500.00"))
+    Inventory.objects.filter(variant=variant).update(stock_quantity=3)
+
+    with pytest.raises(ValueError, match="Insufficient stock for TSHIRT-0"):
+        checkout(cart)
+
+    inventory = Inventory.objects.get(variant=variant)
+    assert (inventory.stock_quantity, inventory.reserved_quantity) == (3, 4)
+    assert CartItem.objects.filter(cart=cart).count() == 2
+
+def test_ledger_records_one_sale_per_variant(settings):
+    settings.INVENTORY_LEDGER = True
+    first, second = setup_variants(2)
+    cart = Cart.objects.create(user_id=1)
+    add_to_cart(cart, first, 1, Decimal("500.00"))
+    add_to_cart(cart, second, 2, Decimal("500.00"))
+    add_to_cart(cart, first, 3, Decimal("500.00"))
+
+    checkout(cart)
+
+    sales = dict(InventoryMovement.objects.filter(kind="SALE").values_list("variant_id", "quantity"))
+    assert sales == {first.id: 4, second.id: 2}
+    assert ledger.stock_levels([first.id, second.id]) == {first.id: [6, 0], second.id: [8, 0]}
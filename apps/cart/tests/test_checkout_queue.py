@@ -0,0 +1,94 @@
+import pytest
+from decimal import Decimal
+from rest_framework.test import APIClient
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.inventory.models import Inventory
+from apps.cart.models import Cart, CheckoutJob
+from apps.cart.services import add_to_cart, process_checkout_group
+
+pytestmark = pytest.mark.django_db
+
+def setup_variant(sku, stock):
+    cat = Category.objects.create(name="TestCat")
+    prod = Product.objects.create(name="TestProd", base_price=100, status="active", category=cat)
+    var = Variant.objects.create(product=prod, sku=sku, attributes={}, price_adjustment=0)
+    inv = Inventory.objects.create(variant=var, stock_quantity=stock, reserved_quantity=0)
+    return var, inv
+
+def test_group_commit_accepts_in_arrival_order():
+    var, inv = setup_variant("HOT-SKU", 6)
+    other, _ = setup_variant("COLD-SKU", 5)
+
+    jobs = []
+    for user_id in (1, 2, 3):
+        cart = Cart.objects.create(user_id=user_id)
+        add_to_cart(cart, var, 2, Decimal("100.00"))
+        jobs.append(CheckoutJob.objects.create(cart=cart, user_id=user_id))
+    cold_cart = Cart.objects.create(user_id=4)
+    add_to_cart(cold_cart, other, 1, Decimal("100.00"))
+    cold_job = CheckoutJob.objects.create(cart=cold_cart, user_id=4)
+
+    # A stock correction leaves room for two of the three hot checkouts.
+    Inventory.objects.filter(pk=inv.pk).update(stock_quantity=5)
+
+    assert process_checkout_group() == 3
+
+    statuses = [CheckoutJob.objects.get(pk=job.pk).status for job in jobs]
+    assert statuses == ["ACCEPTED", "ACCEPTED", "REJECTED"]
+    inv.refresh_from_db()
+    assert inv.stock_quantity == 1
+    assert inv.reserved_quantity == 2
+    assert CheckoutJob.objects.get(pk=cold_job.pk).status == "PENDING"
+
+    assert process_checkout_group() == 1
+    assert process_checkout_group() == 0
+
+def test_async_checkout_returns_pollable_job(settings):
+    settings.CHECKOUT_ASYNC = True
+    var, inv = setup_variant("ASYNC-SKU", 10)
+    cart = Cart.objects.create(user_id=7)
+    add_to_cart(cart, var, 3, Decimal("100.00"))
+    client = APIClient()
+
+    response = client.post("/api/cart/checkout/", {"user_id": 7}, format="json")
+    assert response.status_code == 202
+    job_id = response.data["job_id"]
+
+    process_checkout_group()
+
+    response = client.get(f"/api/cart/checkout/jobs/{job_id}/")
+    assert response.data["status"] == "ACCEPTED"
+    inv.refresh_from_db()
+    assert inv.stock_quantity == 7
+
+def test_repeated_checkout_reuses_the_pending_job(settings):
+    settings.CHECKOUT_ASYNC = True
+    var, inv = setup_variant("TWICE-SKU", 10)
+    cart = Cart.objects.create(user_id=8)
+    add_to_cart(cart, var, 3, Decimal("100.00"))
+    client = APIClient()
+
+    first = client.post("/api/cart/checkout/", {"user_id": 8}, format="json")
+    second = client.post("/api/cart/checkout/", {"user_id": 8}, format="json")
+
+    assert first.data["job_id"] == second.data["job_id"]
+    assert CheckoutJob.objects.filter(cart=cart).count() == 1
+
+def test_duplicate_jobs_in_a_group_deduct_once():
+    var, inv = setup_variant("DUP-SKU", 10)
+    cart = Cart.objects.create(user_id=9)
+    add_to_cart(cart, var, 3, Decimal("100.00"))
+    other = Cart.objects.create(user_id=10)
+    add_to_cart(other, var, 3, Decimal("100.00"))
+    first = CheckoutJob.objects.create(cart=cart, user_id=9)
+    duplicate = CheckoutJob.objects.create(cart=cart, user_id=9)
+
+    assert process_checkout_group() == 2
+
+    assert CheckoutJob.objects.get(pk=first.pk).status == "ACCEPTED"
+    duplicate.refresh_from_db()
+    assert (duplicate.status, duplicate.error) == ("REJECTED", "Duplicate checkout for this cart")
+    inv.refresh_from_db()
+    assert (inv.stock_quantity, inv.reserved_quantity) == (7, 3)
@@ -0,0 +1,54 @@
+import time
+import fakeredis
+import pytest
+from decimal import Decimal
+from datetime import timedelta
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.inventory.models import Inventory
+from apps.cart.expiry import ExpiryScheduler
+from apps.cart.models import Cart, CartItem
+from apps.cart.services import RESERVATION_TTL, add_to_cart, checkout
+from tasks.inventory_cleanup import release_expired_reservations
+
+pytestmark = pytest.mark.django_db
+
+def setup_variant(stock=10):
+    cat = Category.objects.create(name="TestCat")
+    prod = Product.objects.create(name="TestProd", base_price=100, status="active", category=cat)
+    var = Variant.objects.create(product=prod, sku="SKU-EXPIRY", attributes={}, price_adjustment=0)
+    inv = Inventory.objects.create(variant=var, stock_quantity=stock, reserved_quantity=0)
+    return var, inv
+
+def test_scheduler_releases_exactly_the_due_holds():
+    scheduler = ExpiryScheduler(client=fakeredis.FakeRedis(decode_responses=True))
+    var, inv = setup_variant()
+    for user_id in (1, 2, 3):
+        add_to_cart(Cart.objects.create(user_id=user_id), var, 2, Decimal("100.00"))
+    items = list(CartItem.objects.order_by("id"))
+    items[0].reservation_expires_at -= RESERVATION_TTL
+    items[0].save()
+    scheduler.schedule(items)
+    checkout(Cart.objects.get(user_id=3))
+
+    assert scheduler.release_due() == 1
+    inv.refresh_from_db()
+    assert inv.reserved_quantity == 2
+
+    # The checked-out item is claimed but has nothing left to release.
+    assert scheduler.release_due(now=time.time() + RESERVATION_TTL.total_seconds() + 1) == 1
+    inv.refresh_from_db()
+    assert (inv.stock_quantity, inv.reserved_quantity) == (8, 0)
+    assert scheduler.client.zcard(ExpiryScheduler.KEY) == 0
+
+def test_scan_sweep_releases_missed_holds():
+    var, inv = setup_variant()
+    add_to_cart(Cart.objects.create(user_id=1), var, 3, Decimal("100.00"))
+    CartItem.objects.update(reservation_expires_at=CartItem.objects.get().reservation_expires_at - timedelta(hours=1))
+
+    release_expired_reservations()
+
+    inv.refresh_from_db()
+    assert inv.reserved_quantity == 0
+    assert not CartItem.objects.exists()
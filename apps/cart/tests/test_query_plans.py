@@ -0,0 +1,128 @@
+"""
+Hot paths against a seeded database: every statement they run must be
+servable by an index on the hot tables, and each path must stay within its
+query budget regardless of cart size.
+
+Plans are taken with sequential scans disabled: at test-sized tables the
+planner rightly prefers them, so this checks that a usable index exists
+rather than which plan a production-sized table would get.
+"""
+import re
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.cart.models import Cart, CartItem
+from apps.cart.services import add_to_cart, checkout
+from apps.inventory.models import Inventory
+from apps.pricing.engine import PricingEngine
+from apps.pricing.models import PricingRule
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from tasks.inventory_cleanup import release_expired_reservations
+
+pytestmark = pytest.mark.django_db
+
+HOT_TABLES = {
+    Cart._meta.db_table,
+    CartItem._meta.db_table,
+    Inventory._meta.db_table,
+    PricingRule._meta.db_table,
+    Product._meta.db_table,
+    Variant._meta.db_table,
+}
+ROWS = 3000
+
+@pytest.fixture
+def seeded(settings):
+    settings.CATALOG_CACHE_ENABLED = False
+    categories = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(20)])
+    products = Product.objects.bulk_create([
+        Product(
+            name=f"Product {i}", description="", base_price=Decimal("10.00"),
+            status="active" if i % 4 else "archived", category=categories[i % 20],
+        )
+        for i in range(ROWS)
+    ])
+    variants = Variant.objects.bulk_create([
+        Variant(product=product, sku=f"SKU-{product.id}", attributes={"size": "M"}) for product in products
+    ])
+    Inventory.objects.bulk_create([
+        Inventory(variant=variant, stock_quantity=100, reserved_quantity=1) for variant in variants
+    ])
+    PricingRule.objects.bulk_create([
+        PricingRule(rule_type="BULK", priority=i, config={"min_qty": 10, "discount_percent": 5}, is_active=i < 3)
+        for i in range(300)
+    ])
+    carts = Cart.objects.bulk_create([Cart(user_id=i) for i in range(ROWS)])
+    later = timezone.now() + timedelta(minutes=15)
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, variant=variant, quantity=1, price_snapshot=Decimal("10.00"), reservation_expires_at=later)
+        for cart, variant in zip(carts, variants)
+    ])
+    with connection.cursor() as cursor:
+        for table in HOT_TABLES:
+            cursor.execute(f"ANALYZE {table}")
+    return variants
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute("SET enable_seqscan = off")
+        try:
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.execute("RESET enable_seqscan")
+
+def assert_indexed(queries):
+    for query in queries:
+        sql = query["sql"]
+        if not re.match(r"\s*(SELECT|UPDATE|DELETE|WITH)\b", sql, re.IGNORECASE):
+            continue
+        plan = explain(sql)
+        scanned = set(re.findall(r"Seq Scan on (\w+)", plan)) & HOT_TABLES
+        assert not scanned, f"Sequential scan of {scanned}:\n{sql}\n{plan}"
+
+def run(budget, fn):
+    with CaptureQueriesContext(connection) as queries:
+        fn()
+    assert len(queries) <= budget, "\n".join(query["sql"] for query in queries)
+    assert_indexed(queries)
+    return queries
+
+def test_pricing_engine(seeded):
+    queries = run(1, lambda: PricingEngine().calculate(Decimal("10.00"), 12))
+
+    assert "pricingrule_active_priority" in explain(queries[0]["sql"])
+
+def test_add_to_cart_view(seeded):
+    variant = seeded[0]
+    payload = {"user_id": 5, "variant_id": variant.id, "quantity": 1, "price": "10.00"}
+
+    queries = run(10, lambda: APIClient().post("/api/cart/add/", payload, format="json"))
+
+    cart_lookup = next(query["sql"] for query in queries if f'FROM "{Cart._meta.db_table}"' in query["sql"])
+    assert "cart_user_status" in explain(cart_lookup)
+
+@pytest.mark.parametrize("lines", [1, 5])
+def test_checkout(seeded, lines):
+    cart = Cart.objects.create(user_id=ROWS + 1)
+    for variant in seeded[100:100 + lines]:
+        add_to_cart(cart, variant, 1, Decimal("10.00"))
+
+    # The budget holds for any cart size: inventory is locked in one query.
+    run(9, lambda: checkout(cart))
+
+def test_release_expired_reservations(seeded):
+    CartItem.objects.filter(id__in=CartItem.objects.order_by("id").values("id")[:20]).update(
+        reservation_expires_at=timezone.now() - timedelta(minutes=1)
+    )
+
+    queries = run(12, release_expired_reservations)
+
+    assert CartItem.objects.count() == ROWS - 20
+    assert "cartitem_expires_at" in explain(queries[0]["sql"])
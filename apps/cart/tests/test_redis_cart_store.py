@@ -0,0 +1,59 @@
+import time
+import fakeredis
+import pytest
+from decimal import Decimal
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.inventory.models import Inventory
+from apps.cart.models import Cart, CartItem
+from apps.cart.stores import RedisCartStore
+
+pytestmark = pytest.mark.django_db
+
+def setup_variant(stock=10):
+    cat = Category.objects.create(name="TestCat")
+    prod = Product.objects.create(name="TestProd", base_price=100, status="active", category=cat)
+    var = Variant.objects.create(product=prod, sku="SKU-REDIS", attributes={}, price_adjustment=0)
+    inv = Inventory.objects.create(variant=var, stock_quantity=stock, reserved_quantity=0)
+    return var, inv
+
+@pytest.fixture
+def store():
+    return RedisCartStore(client=fakeredis.FakeRedis(decode_responses=True))
+
+def test_add_keeps_cart_out_of_postgres(store):
+    var, inv = setup_variant()
+
+    store.add(999, var, 2, Decimal("100.00"))
+
+    inv.refresh_from_db()
+    assert inv.reserved_quantity == 2
+    assert not Cart.objects.exists()
+    assert store.client.ttl("cart:999") == store.ttl
+
+def test_checkout_persists_and_deducts(store):
+    var, inv = setup_variant()
+    store.add(999, var, 2, Decimal("100.00"))
+    store.add(999, var, 1, Decimal("100.00"))
+
+    store.checkout(999)
+
+    inv.refresh_from_db()
+    assert inv.stock_quantity == 7
+    assert inv.reserved_quantity == 0
+    assert not CartItem.objects.exists()
+    assert not store.client.exists("cart:999", "cart:999:held")
+
+def test_expired_cart_is_released_by_sweeper(store):
+    var, inv = setup_variant()
+    store.add(999, var, 4, Decimal("100.00"))
+
+    assert store.release_expired() == 0
+    store.client.delete("cart:999")  # TTL elapsed
+    assert store.release_expired(now=time.time() + store.ttl + 1) == 1
+
+    inv.refresh_from_db()
+    assert inv.reserved_quantity == 0
+    with pytest.raises(Cart.DoesNotExist):
+        store.checkout(999)
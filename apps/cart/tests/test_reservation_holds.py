@@ -0,0 +1,112 @@
+import threading
+import time
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.utils import timezone
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.inventory.models import Inventory
+from apps.cart import holds
+from apps.cart.models import Cart, CartItem, ReservationHold
+from apps.cart.services import RESERVATION_TTL, add_to_cart, checkout
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture(autouse=True)
+def partitioned(settings):
+    settings.RESERVATION_HOLDS_PARTITIONED = True
+    holds.ensure_partitions()
+
+def setup_variant(stock=10):
+    cat = Category.objects.create(name="TestCat")
+    prod = Product.objects.create(name="TestProd", base_price=100, status="active", category=cat)
+    var = Variant.objects.create(product=prod, sku="SKU-HOLD", attributes={}, price_adjustment=0)
+    inv = Inventory.objects.create(variant=var, stock_quantity=stock, reserved_quantity=0)
+    return var, inv
+
+def test_partitions_are_created_ahead():
+    names = [name for name, _, _ in holds.partitions()]
+    assert len(names) == 7
+    assert holds.ensure_partitions() == 0
+
+def test_checkout_consumes_holds():
+    var, inv = setup_variant()
+    cart = Cart.objects.create(user_id=1)
+    add_to_cart(cart, var, 2, Decimal("100.00"))
+    assert ReservationHold.objects.count() == 1
+
+    checkout(cart)
+
+    inv.refresh_from_db()
+    assert (inv.stock_quantity, inv.reserved_quantity) == (8, 0)
+    assert not ReservationHold.objects.exists()
+
+def test_expired_partitions_are_released_and_dropped():
+    var, inv = setup_variant()
+    for user_id in (1, 2, 3):
+        add_to_cart(Cart.objects.create(user_id=user_id), var, 2, Decimal("100.00"))
+    before = len(holds.partitions())
+
+    later = timezone.now() + RESERVATION_TTL + holds._interval()
+    assert holds.release_expired(now=later) == 3
+
+    inv.refresh_from_db()
+    assert inv.reserved_quantity == 0
+    assert not CartItem.objects.exists()
+    assert len(holds.partitions()) < before
+
+    with pytest.raises(ValueError):
+        checkout(Cart.objects.get(user_id=1))
+
+def waiting_on_locks():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+        )
+        return cursor.fetchone()[0]
+
+@pytest.mark.django_db(transaction=True)
+def test_dropping_a_partition_does_not_deadlock_a_checkout(monkeypatch):
+    var, inv = setup_variant()
+    cart = Cart.objects.create(user_id=1)
+    add_to_cart(cart, var, 2, Decimal("100.00"))
+    later = timezone.now() + RESERVATION_TTL + holds._interval()
+    paused, resume = threading.Event(), threading.Event()
+    release = holds._release
+    results = {}
+
+    def pausing_release(rows):
+        # The hold's partition is locked here; keep it while a checkout arrives.
+        if rows:
+            paused.set()
+            resume.wait(5)
+        return release(rows)
+
+    def run(name, fn):
+        try:
+            results[name] = fn()
+        except Exception as exc:
+            results[name] = exc
+        finally:
+            connection.close()
+
+    monkeypatch.setattr(holds, "_release", pausing_release)
+    sweeper = threading.Thread(target=run, args=("released", lambda: holds.release_expired(now=later)))
+    sweeper.start()
+    assert paused.wait(5)
+    buyer = threading.Thread(target=run, args=("checkout", lambda: checkout(cart)))
+    buyer.start()
+    deadline = time.monotonic() + 5
+    while not waiting_on_locks() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    resume.set()
+    sweeper.join()
+    buyer.join()
+
+    assert results["released"] == 1
+    assert isinstance(results["checkout"], ValueError)
+    inv.refresh_from_db()
+    assert (inv.stock_quantity, inv.reserved_quantity) == (10, 0)
@@ -0,0 +1,36 @@
+import pytest
+from decimal import Decimal
+from datetime import timedelta
+from django.utils import timezone
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.inventory.models import Inventory
+from apps.cart.models import Cart, CartItem
+from apps.cart.services import add_to_cart
+from tasks.inventory_cleanup import record_cleanup_stats, release_expired_range, shard_ranges
+
+def test_shard_ranges_are_disjoint_and_bounded():
+    assert shard_ranges([], 4, 10) == []
+    assert shard_ranges([1, 2, 3], 4, 10) == [(1, 1), (2, 2), (3, 3)]
+    assert shard_ranges(list(range(1, 11)), 2, 3) == [(1, 3), (4, 6), (7, 9), (10, 10)]
+    assert shard_ranges([5, 9, 40, 41], 2, 10) == [(5, 9), (40, 41)]
+
+@pytest.mark.django_db
+def test_range_shard_releases_only_its_variants():
+    cat = Category.objects.create(name="TestCat")
+    prod = Product.objects.create(name="TestProd", base_price=100, status="active", category=cat)
+    inventories = []
+    for i in range(3):
+        var = Variant.objects.create(product=prod, sku=f"SKU-SHARD-{i}", attributes={})
+        inventories.append(Inventory.objects.create(variant=var, stock_quantity=10))
+        add_to_cart(Cart.objects.create(user_id=i), var, 2, Decimal("100.00"))
+    CartItem.objects.update(reservation_expires_at=timezone.now() - timedelta(minutes=1))
+
+    first, last = inventories[0].variant_id, inventories[1].variant_id
+    result = release_expired_range(first, last, timezone.now().isoformat())
+
+    assert result["released"] == 2
+    assert [inv.reserved_quantity for inv in Inventory.objects.order_by("variant_id")] == [0, 0, 2]
+    stats = record_cleanup_stats([result], 0)
+    assert stats["released"] == 2 and stats["shards"] == 1
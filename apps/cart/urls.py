@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import AddToCartView, CheckoutView
+from .views import AddToCartView, CheckoutJobView, CheckoutView
 
 urlpatterns = [
     path("add/", AddToCartView.as_view()),
     path("checkout/", CheckoutView.as_view()),
+    path("checkout/jobs/<int:job_id>/", CheckoutJobView.as_view()),
 ]
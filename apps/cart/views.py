@@ -1,17 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Cart
-from .services import add_to_cart, checkout
+from django.conf import settings
+from django.db import transaction
+from .models import Cart, CheckoutJob
+from .stores import get_cart_store
 from apps.products.models.variant import Variant
 
 class AddToCartView(APIView):
     def post(self, request):
-        cart, _ = Cart.objects.get_or_create(user_id=request.data["user_id"])
         variant = Variant.objects.get(id=request.data["variant_id"])
 
-        add_to_cart(
-            cart,
+        get_cart_store().add(
+            request.data["user_id"],
             variant,
             request.data["quantity"],
             request.data["price"]
@@ -27,8 +28,10 @@ class CheckoutView(APIView):
             if not user_id:
                 return Response({"error": "user_id required"}, status=status.HTTP_400_BAD_REQUEST)
 
-            cart = Cart.objects.get(user_id=user_id)
-            checkout(cart)
+            if settings.CHECKOUT_ASYNC:
+                return self.enqueue(user_id)
+
+            get_cart_store().checkout(user_id)
             return Response({"status": "checkout successful", "message": "Inventory updated"}, status=status.HTTP_200_OK)
             
         except Cart.DoesNotExist:
@@ -37,3 +40,32 @@ class CheckoutView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"error": "Checkout failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def enqueue(self, user_id):
+        from .tasks import process_checkout_jobs
+
+        cart = get_cart_store().get_checkout_cart(user_id)
+        with transaction.atomic():
+            # One pending job per cart: a repeated checkout gets the same job.
+            Cart.objects.select_for_update().get(pk=cart.pk)
+            job = CheckoutJob.objects.filter(cart=cart, status="PENDING").first()
+            if job is None:
+                job = CheckoutJob.objects.create(cart=cart, user_id=cart.user_id)
+                transaction.on_commit(process_checkout_jobs.delay)
+
+        return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
+class CheckoutJobView(APIView):
+    def get(self, request, job_id):
+        try:
+            job = CheckoutJob.objects.get(id=job_id)
+        except CheckoutJob.DoesNotExist:
+            return Response({"error": "Checkout job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "job_id": job.id,
+            "status": job.status,
+            "error": job.error,
+            "created_at": job.created_at,
+            "processed_at": job.processed_at,
+        })
@@ -0,0 +1,180 @@
+from django.conf import settings
+from django.db import connection, transaction
+from apps.products.models.variant import Variant
+from .events import notify_availability
+from .models import Inventory, InventoryMovement
+from . import ledger
+
+# Stock columns are Postgres integers.
+MAX_INTEGER = 2 ** 31 - 1
+
+
+class Adjustment:
+    """A resolved stock change for one variant: ``quantity`` (absolute) or ``delta``."""
+
+    __slots__ = ("sku", "variant_id", "delta", "quantity")
+
+    def __init__(self, sku, variant_id):
+        self.sku = sku
+        self.variant_id = variant_id
+        self.delta = 0
+        self.quantity = None
+
+    def add(self, record):
+        if "quantity" in record:
+            self.quantity, self.delta = record["quantity"], 0
+        else:
+            self.delta += record["delta"]
+
+    def new_stock(self, stock):
+        return self.quantity + self.delta if self.quantity is not None else stock + self.delta
+
+
+def validate(record):
+    """Return an error message for a malformed record, or None."""
+    if not isinstance(record, dict) or not isinstance(record.get("sku"), str):
+        return "sku is required"
+    given = [key for key in ("delta", "quantity") if key in record]
+    if len(given) != 1:
+        return "Exactly one of delta or quantity is required"
+    value = record[given[0]]
+    if not isinstance(value, int) or isinstance(value, bool):
+        return f"{given[0]} must be an integer"
+    if given[0] == "quantity" and value < 0:
+        return "quantity must not be negative"
+    if abs(value) > MAX_INTEGER:
+        return f"{given[0]} must be between {-MAX_INTEGER} and {MAX_INTEGER}"
+    return None
+
+
+def apply_adjustments(records, chunk_size=None):
+    """
+    Apply ``{"sku", "delta"}`` / ``{"sku", "quantity"}`` records in bulk.
+
+    Records for the same SKU are combined in order. Variants are processed
+    in variant_id order, ``chunk_size`` per transaction: the chunk's
+    Inventory rows are locked in that order (as checkout does) and updated
+    by one ``UPDATE ... FROM (VALUES ...)``. A row whose stock would drop
+    below its reserved quantity is rejected on its own. Returns
+    ``{"applied": [...], "rejected": [...]}``.
+    """
+    chunk_size = chunk_size or settings.INVENTORY_ADJUST_CHUNK_SIZE
+    rejected = []
+    valid = []
+    for record in records:
+        error = validate(record)
+        if error:
+            rejected.append({"sku": record.get("sku") if isinstance(record, dict) else None, "error": error})
+        else:
+            valid.append(record)
+
+    variant_ids = dict(
+        Variant.objects.filter(sku__in={record["sku"] for record in valid}).values_list("sku", "id")
+    )
+    adjustments = {}
+    for record in valid:
+        variant_id = variant_ids.get(record["sku"])
+        if variant_id is None:
+            rejected.append({"sku": record["sku"], "error": "Unknown SKU"})
+            continue
+        adjustments.setdefault(variant_id, Adjustment(record["sku"], variant_id)).add(record)
+
+    ordered = [adjustments[variant_id] for variant_id in sorted(adjustments)]
+    applied = []
+    for start in range(0, len(ordered), chunk_size):
+        chunk_applied, chunk_rejected = _apply_chunk(ordered[start:start + chunk_size])
+        applied += chunk_applied
+        rejected += chunk_rejected
+    return {"applied": applied, "rejected": rejected}
+
+
+def _apply_chunk(chunk):
+    variant_ids = [adjustment.variant_id for adjustment in chunk]
+    with transaction.atomic():
+        if ledger.ledger_enabled():
+            ledger.lock_variants(variant_ids)
+            levels = ledger.stock_levels(variant_ids)
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT variant_id, stock_quantity, reserved_quantity FROM {Inventory._meta.db_table}
+                    WHERE variant_id = ANY(%s) ORDER BY variant_id FOR UPDATE
+                    """,
+                    [variant_ids],
+                )
+                levels = {variant_id: [stock, reserved] for variant_id, stock, reserved in cursor.fetchall()}
+
+        accepted, rejected = [], []
+        for adjustment in chunk:
+            if adjustment.variant_id not in levels:
+                rejected.append({"sku": adjustment.sku, "error": "No inventory record"})
+                continue
+            stock, reserved = levels[adjustment.variant_id]
+            # Deltas for one SKU add up, so the sum can still overflow.
+            if abs(adjustment.delta) > MAX_INTEGER or adjustment.new_stock(stock) > MAX_INTEGER:
+                rejected.append({"sku": adjustment.sku, "error": f"Stock would exceed {MAX_INTEGER}"})
+                continue
+            if adjustment.new_stock(stock) < reserved:
+                rejected.append({
+                    "sku": adjustment.sku,
+                    "error": f"Stock {adjustment.new_stock(stock)} would be below reserved {reserved}",
+                })
+                continue
+            accepted.append(adjustment)
+
+        if ledger.ledger_enabled():
+            rows = _record_movements(accepted, levels)
+        else:
+            rows = _update_inventory(accepted)
+
+        # The rows are locked, so the guard in the UPDATE only ever agrees
+        # with the check above; anything it drops is still reported.
+        updated = {variant_id: (stock, reserved) for variant_id, stock, reserved in rows}
+        applied = []
+        for adjustment in accepted:
+            if adjustment.variant_id not in updated:
+                rejected.append({"sku": adjustment.sku, "error": "Stock would be below reserved"})
+                continue
+            stock, reserved = updated[adjustment.variant_id]
+            applied.append({
+                "sku": adjustment.sku,
+                "variant_id": adjustment.variant_id,
+                "stock_quantity": stock,
+                "available": stock - reserved,
+            })
+        notify_availability(list(updated))
+    return applied, rejected
+
+
+def _update_inventory(adjustments):
+    if not adjustments:
+        return []
+    values = ", ".join(["(%s::bigint, %s::integer, %s::integer)"] * len(adjustments))
+    params = []
+    for adjustment in adjustments:
+        params += [adjustment.variant_id, adjustment.delta, adjustment.quantity]
+    new_stock = "COALESCE(v.quantity + v.delta, i.stock_quantity + v.delta)"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Inventory._meta.db_table} i SET stock_quantity = {new_stock}
+            FROM (VALUES {values}) AS v(variant_id, delta, quantity)
+            WHERE i.variant_id = v.variant_id AND {new_stock} >= i.reserved_quantity
+            RETURNING i.variant_id, i.stock_quantity, i.reserved_quantity
+            """,
+            params,
+        )
+        return cursor.fetchall()
+
+
+def _record_movements(adjustments, levels):
+    movements, rows = [], []
+    for adjustment in adjustments:
+        stock, reserved = levels[adjustment.variant_id]
+        change = adjustment.new_stock(stock) - stock
+        if change:
+            movements.append(ledger.movement(adjustment.variant_id, "RESTOCK" if change > 0 else "REMOVE", abs(change)))
+        rows.append((adjustment.variant_id, stock + change, reserved))
+    InventoryMovement.objects.bulk_create(movements)
+    return rows
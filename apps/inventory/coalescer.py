@@ -0,0 +1,89 @@
+import threading
+import time
+from functools import lru_cache
+from django.conf import settings
+from django.db import transaction
+from .events import notify_availability
+from .models import Inventory
+
+
+class _Reservation:
+    __slots__ = ("qty", "done", "ok", "error")
+
+    def __init__(self, qty):
+        self.qty = qty
+        self.done = threading.Event()
+        self.ok = False
+        self.error = None
+
+
+class ReservationCoalescer:
+    """
+    Merges concurrent reservations for the same variant into one locked UPDATE.
+
+    The first caller for a variant becomes the leader: it waits ``window``
+    seconds for other callers to join, then locks the Inventory row once and
+    grants the batch in arrival order while stock lasts. Every caller gets
+    the same outcome ``reserve_stock`` would have given it.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def reserve(self, variant_id, qty):
+        reservation = _Reservation(qty)
+        with self._lock:
+            batch = self._pending.get(variant_id)
+            leader = batch is None
+            if leader:
+                batch = self._pending[variant_id] = []
+            batch.append(reservation)
+
+        if leader:
+            time.sleep(self.window)
+            with self._lock:
+                batch = self._pending.pop(variant_id)
+            try:
+                self._commit(variant_id, batch)
+            except Exception as exc:
+                for waiting in batch:
+                    waiting.error = exc
+            finally:
+                for waiting in batch:
+                    waiting.done.set()
+        else:
+            reservation.done.wait()
+
+        if reservation.error is not None:
+            raise reservation.error
+        if not reservation.ok:
+            raise ValueError("Insufficient stock")
+
+    def _commit(self, variant_id, batch):
+        with transaction.atomic():
+            inventory = Inventory.objects.select_for_update().get(variant_id=variant_id)
+            available = inventory.available_quantity
+            granted = 0
+            for reservation in batch:
+                if reservation.qty <= available - granted:
+                    reservation.ok = True
+                    granted += reservation.qty
+
+            if granted:
+                inventory.reserved_quantity += granted
+                inventory.save(update_fields=["reserved_quantity"])
+                notify_availability([variant_id])
+
+
+@lru_cache(maxsize=None)
+def _build_coalescer(window_ms):
+    return ReservationCoalescer(window_ms / 1000)
+
+
+def get_reservation_coalescer():
+    window_ms = settings.INVENTORY_RESERVATION_COALESCE_MS
+    if not window_ms:
+        return None
+    return _build_coalescer(window_ms)
@@ -0,0 +1,202 @@
+import json
+import logging
+import select
+import threading
+import time
+from django.conf import settings
+from django.db import connection, connections
+from .models import Inventory
+from . import ledger
+
+logger = logging.getLogger(__name__)
+
+
+def events_enabled():
+    return settings.INVENTORY_EVENTS
+
+
+def availability(variant_ids=None):
+    """
+    Return ``{variant_id: available_quantity}`` as seen by the current
+    transaction, in one query; every variant when ``variant_ids`` is None.
+    """
+    if variant_ids is not None and not variant_ids:
+        return {}
+    if ledger.ledger_enabled():
+        levels = ledger.stock_levels(variant_ids)
+        return {variant_id: stock - reserved for variant_id, (stock, reserved) in levels.items()}
+    inventories = Inventory.objects.all()
+    if variant_ids is not None:
+        inventories = inventories.filter(variant_id__in=variant_ids)
+    rows = inventories.values_list("variant_id", "stock_quantity", "reserved_quantity")
+    return {variant_id: stock - reserved for variant_id, stock, reserved in rows}
+
+
+def notify_availability(variant_ids):
+    """
+    NOTIFY the new available quantity of each variant. Called inside the
+    transaction that changed the stock, so listeners only hear about
+    committed changes (Postgres delivers notifications on commit), in
+    commit order; the payload is computed under the variant's lock.
+    """
+    if not events_enabled() or not variant_ids:
+        return
+    if ledger.ledger_enabled():
+        # Ledger writers hold no row lock; without the variant lock a
+        # concurrent transaction could compute an older value and send it
+        # last. (Other writers already hold the Inventory rows FOR UPDATE.)
+        ledger.lock_variants(variant_ids)
+    payloads = [
+        json.dumps({"variant_id": variant_id, "available": available})
+        for variant_id, available in sorted(availability(variant_ids).items())
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+            [settings.INVENTORY_EVENTS_CHANNEL, payloads],
+        )
+
+
+class Subscription:
+    """Updates for a set of variants; unread updates for a variant are merged."""
+
+    def __init__(self, hub, variant_ids):
+        self.hub = hub
+        self.variant_ids = frozenset(variant_ids)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._pending = {}
+
+    def push(self, updates):
+        with self._lock:
+            self._pending.update(updates)
+            self._ready.set()
+
+    def get(self, timeout=None):
+        """Wait up to ``timeout`` seconds; returns ``{variant_id: available}`` (empty on timeout)."""
+        self._ready.wait(timeout)
+        with self._lock:
+            updates, self._pending = self._pending, {}
+            self._ready.clear()
+        return updates
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class AvailabilityHub:
+    """
+    Fans inventory NOTIFYs out to in-process subscribers.
+
+    One thread per process LISTENs on its own connection. Notifications are
+    collected for ``interval`` seconds and only the latest value per variant
+    is passed on, so a subscriber gets at most one update per variant per
+    interval however hot the variant is. Observers see every notification
+    as it arrives.
+
+    ``connected_since`` is when the current LISTEN was established (None
+    while disconnected) and ``last_poll`` when the connection was last
+    drained; notifications committed before ``last_poll`` have been seen.
+    """
+
+    def __init__(self, channel, interval):
+        self.channel = channel
+        self.interval = interval
+        self.connected_since = None
+        self.last_poll = None
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._observers = []
+        self._pending = {}
+        self._thread = None
+
+    def subscribe(self, variant_ids):
+        subscription = Subscription(self, variant_ids)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def observe(self, callback):
+        """Call ``callback(variant_id, available)`` for every notification."""
+        with self._lock:
+            self._observers.append(callback)
+
+    def handle(self, payload):
+        event = json.loads(payload)
+        with self._lock:
+            self._pending[event["variant_id"]] = event["available"]
+            observers = list(self._observers)
+        for callback in observers:
+            callback(event["variant_id"], event["available"])
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            subscribers = list(self._subscribers)
+        if not pending:
+            return
+        for subscription in subscribers:
+            updates = {
+                variant_id: available for variant_id, available in pending.items()
+                if variant_id in subscription.variant_ids
+            }
+            if updates:
+                subscription.push(updates)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="inventory-availability-hub", daemon=True)
+                self._thread.start()
+
+    def run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.warning("Inventory availability listener lost its connection; retrying", exc_info=True)
+                time.sleep(1)
+
+    def _listen(self):
+        db = connections.create_connection("default")
+        try:
+            db.ensure_connection()
+            raw = db.connection
+            with raw.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            self.connected_since = self.last_poll = time.time()
+
+            next_flush = time.monotonic() + self.interval
+            while True:
+                timeout = max(next_flush - time.monotonic(), 0)
+                polled_at = time.time()
+                if select.select([raw], [], [], timeout)[0]:
+                    polled_at = time.time()
+                    raw.poll()
+                    for notify in raw.notifies:
+                        self.handle(notify.payload)
+                    raw.notifies.clear()
+                self.last_poll = polled_at
+                if time.monotonic() >= next_flush:
+                    self.flush()
+                    next_flush = time.monotonic() + self.interval
+        finally:
+            self.connected_since = None
+            db.close()
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_availability_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = AvailabilityHub(settings.INVENTORY_EVENTS_CHANNEL, settings.INVENTORY_EVENTS_INTERVAL)
+            _hub.start()
+    return _hub
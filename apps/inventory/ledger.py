@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from .models import Inventory, InventoryMovement
+
+# (stock_delta, reserved_delta) per unit for each movement kind.
+DELTAS = {
+    "RESERVE": (0, 1),
+    "RELEASE": (0, -1),
+    "SALE": (-1, -1),
+    "RESTOCK": (1, 0),
+    "REMOVE": (-1, 0),
+}
+
+# First key of the two-part advisory lock, so ledger locks cannot collide
+# with other advisory lock users.
+LOCK_NAMESPACE = 2029
+
+
+def ledger_enabled():
+    return settings.INVENTORY_LEDGER
+
+
+def movement(variant_id, kind, qty):
+    stock_delta, reserved_delta = DELTAS[kind]
+    return InventoryMovement(
+        variant_id=variant_id,
+        kind=kind,
+        quantity=qty,
+        stock_delta=stock_delta * qty,
+        reserved_delta=reserved_delta * qty,
+    )
+
+
+def record(variant_id, kind, qty):
+    movement(variant_id, kind, qty).save()
+
+
+def lock_variants(variant_ids):
+    """Serialise stock checks per variant without touching the Inventory row."""
+    with connection.cursor() as cursor:
+        for variant_id in sorted(variant_ids):
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [LOCK_NAMESPACE, variant_id])
+
+
+def stock_levels(variant_ids=None):
+    """
+    Return ``{variant_id: [stock, reserved]}`` as the Inventory snapshot plus
+    the movements not compacted yet, read in a single statement. Covers every
+    variant when ``variant_ids`` is None.
+    """
+    where, params = ("WHERE i.variant_id = ANY(%s)", [list(variant_ids)]) if variant_ids is not None else ("", [])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT i.variant_id,
+                   i.stock_quantity + COALESCE(SUM(m.stock_delta), 0),
+                   i.reserved_quantity + COALESCE(SUM(m.reserved_delta), 0)
+            FROM {Inventory._meta.db_table} i
+            LEFT JOIN {InventoryMovement._meta.db_table} m
+                ON m.variant_id = i.variant_id AND NOT m.compacted
+            {where}
+            GROUP BY i.variant_id, i.stock_quantity, i.reserved_quantity
+            """,
+            params,
+        )
+        return {variant_id: [stock, reserved] for variant_id, stock, reserved in cursor.fetchall()}
+
+
+def _levels_for(variant_id):
+    levels = stock_levels([variant_id])
+    if variant_id not in levels:
+        raise Inventory.DoesNotExist
+    return levels[variant_id]
+
+
+def reserve(variant_id, qty):
+    with transaction.atomic():
+        lock_variants([variant_id])
+        stock, reserved = _levels_for(variant_id)
+        if stock - reserved < qty:
+            raise ValueError("Insufficient stock")
+        record(variant_id, "RESERVE", qty)
+
+
+def release(variant_id, qty):
+    with transaction.atomic():
+        lock_variants([variant_id])
+        record(variant_id, "RELEASE", qty)
+
+
+def sell(variant_id, qty, sku):
+    with transaction.atomic():
+        lock_variants([variant_id])
+        stock, _ = _levels_for(variant_id)
+        if stock < qty:
+            raise ValueError(f"Insufficient stock for {sku}")
+        record(variant_id, "SALE", qty)
+
+
+def restock(variant_id, qty):
+    record(variant_id, "RESTOCK", qty)
+
+
+def compact(batch_size=10000):
+    """
+    Fold the oldest pending movements into their Inventory rows.
+
+    Movements are marked compacted and summed by the same statement, so a
+    movement is folded exactly once. Returns the number of movements folded.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH folded AS (
+                UPDATE {InventoryMovement._meta.db_table} SET compacted = TRUE
+                WHERE id IN (
+                    SELECT id FROM {InventoryMovement._meta.db_table}
+                    WHERE NOT compacted ORDER BY id LIMIT %s
+                )
+                RETURNING variant_id, stock_delta, reserved_delta
+            ), totals AS (
+                SELECT variant_id,
+                       SUM(stock_delta) AS stock_delta,
+                       SUM(reserved_delta) AS reserved_delta,
+                       COUNT(*) AS movements
+                FROM folded GROUP BY variant_id
+            ), applied AS (
+                UPDATE {Inventory._meta.db_table} i
+                SET stock_quantity = i.stock_quantity + t.stock_delta,
+                    reserved_quantity = i.reserved_quantity + t.reserved_delta
+                FROM totals t
+                WHERE i.variant_id = t.variant_id
+            )
+            SELECT COALESCE(SUM(movements), 0) FROM totals
+            """,
+            [batch_size],
+        )
+        return cursor.fetchone()[0]
+
+
+def stock_at(variant_id, at):
+    """Rebuild ``(stock, reserved)`` for a variant as it was at ``at``."""
+    stock, reserved = _levels_for(variant_id)
+    later = InventoryMovement.objects.filter(variant_id=variant_id, created_at__gt=at).aggregate(
+        stock=Sum("stock_delta"), reserved=Sum("reserved_delta")
+    )
+    return stock - (later["stock"] or 0), reserved - (later["reserved"] or 0)
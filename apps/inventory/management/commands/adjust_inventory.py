@@ -0,0 +1,38 @@
+import csv
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from apps.inventory.adjustments import apply_adjustments
+
+
+class Command(BaseCommand):
+    help = "Apply bulk stock adjustments from a CSV with sku and delta or quantity columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file; '-' reads stdin.")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Variants per transaction.")
+
+    def handle(self, *args, **options):
+        if options["path"] == "-":
+            records = self.read(sys.stdin)
+        else:
+            with open(options["path"], newline="") as handle:
+                records = self.read(handle)
+
+        result = apply_adjustments(records, chunk_size=options["chunk_size"])
+        for row in result["rejected"]:
+            self.stderr.write(f"rejected {row['sku']}: {row['error']}")
+        self.stdout.write(f"{len(result['applied'])} applied, {len(result['rejected'])} rejected")
+
+    def read(self, handle):
+        reader = csv.DictReader(handle)
+        columns = [column for column in ("delta", "quantity") if column in (reader.fieldnames or [])]
+        if "sku" not in (reader.fieldnames or []) or len(columns) != 1:
+            raise CommandError("Expected a sku column and exactly one of delta or quantity")
+        column = columns[0]
+        records = []
+        for line, row in enumerate(reader, start=2):
+            try:
+                records.append({"sku": row["sku"], column: int(row[column])})
+            except ValueError:
+                raise CommandError(f"Line {line}: {column} must be an integer")
+        return records
@@ -0,0 +1,70 @@
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from apps.inventory.coalescer import ReservationCoalescer
+from apps.inventory.models import Inventory
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+
+class Command(BaseCommand):
+    help = "Compare per-request locking with coalesced reservations on one hot variant."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--reservations", type=int, default=50, help="Reservations per thread.")
+        parser.add_argument("--window-ms", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        per_thread = options["reservations"]
+        total = threads * per_thread
+
+        category = Category.objects.create(name="bench-reservations")
+        product = Product.objects.create(
+            name="bench-reservations", description="", base_price=1, status="archived", category=category
+        )
+        variant = Variant.objects.create(product=product, sku=f"BENCH-RES-{time.time_ns()}", attributes={})
+        inventory = Inventory.objects.create(variant=variant, stock_quantity=total * 2)
+
+        try:
+            from apps.inventory.services import reserve_stock
+            coalescer = ReservationCoalescer(options["window_ms"] / 1000)
+            modes = [
+                ("per-request lock", lambda: reserve_stock(variant.id, 1)),
+                (f"coalesced ({options['window_ms']}ms)", lambda: coalescer.reserve(variant.id, 1)),
+            ]
+            for label, reserve in modes:
+                Inventory.objects.filter(pk=inventory.pk).update(reserved_quantity=0)
+                elapsed = self.run_threads(threads, per_thread, reserve)
+                inventory.refresh_from_db()
+                assert inventory.reserved_quantity == total
+                self.stdout.write(
+                    f"{label:>24}: {total} reservations in {elapsed:.2f}s "
+                    f"({total / elapsed:,.0f}/s)"
+                )
+        finally:
+            product.delete()
+            category.delete()
+
+    def run_threads(self, threads, per_thread, reserve):
+        barrier = threading.Barrier(threads + 1)
+
+        def worker():
+            barrier.wait()
+            try:
+                for _ in range(per_thread):
+                    reserve()
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in workers:
+            t.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for t in workers:
+            t.join()
+        return time.perf_counter() - started
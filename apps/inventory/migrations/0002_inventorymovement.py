@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('RESERVE', 'Reserve'), ('RELEASE', 'Release'), ('SALE', 'Sale'), ('RESTOCK', 'Restock')], max_length=20)),
+                ('quantity', models.PositiveIntegerField()),
+                ('stock_delta', models.IntegerField()),
+                ('reserved_delta', models.IntegerField()),
+                ('compacted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='products.variant')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('compacted', False)), fields=['variant'], name='inventory_movement_pending'), models.Index(fields=['variant', 'created_at'], name='inventory_movement_history')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_inventorymovement'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='kind',
+            field=models.CharField(choices=[('RESERVE', 'Reserve'), ('RELEASE', 'Release'), ('SALE', 'Sale'), ('RESTOCK', 'Restock'), ('REMOVE', 'Remove')], max_length=20),
+        ),
+    ]
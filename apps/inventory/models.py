@@ -9,3 +9,30 @@ class Inventory(models.Model):
     @property
     def available_quantity(self):
         return self.stock_quantity - self.reserved_quantity
+
+class InventoryMovement(models.Model):
+    KINDS = (
+        ("RESERVE", "Reserve"),
+        ("RELEASE", "Release"),
+        ("SALE", "Sale"),
+        ("RESTOCK", "Restock"),
+        ("REMOVE", "Remove"),
+    )
+
+    variant = models.ForeignKey(Variant, related_name="inventory_movements", on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KINDS)
+    quantity = models.PositiveIntegerField()
+    stock_delta = models.IntegerField()
+    reserved_delta = models.IntegerField()
+    compacted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["variant"],
+                condition=models.Q(compacted=False),
+                name="inventory_movement_pending",
+            ),
+            models.Index(fields=["variant", "created_at"], name="inventory_movement_history"),
+        ]
@@ -1,7 +1,22 @@
-from django.db import transaction
-from .models import Inventory
+from django.db import connection, transaction
+from .models import Inventory, InventoryMovement
+from .coalescer import get_reservation_coalescer
+from .events import notify_availability
+from . import ledger
 
 def reserve_stock(variant_id, qty):
+    if ledger.ledger_enabled():
+        with transaction.atomic():
+            ledger.reserve(variant_id, qty)
+            notify_availability([variant_id])
+        return
+
+    # Coalescing commits on the leader's connection, so callers that are
+    # already inside a transaction keep the direct path.
+    coalescer = get_reservation_coalescer()
+    if coalescer is not None and not transaction.get_connection().in_atomic_block:
+        return coalescer.reserve(variant_id, qty)
+
     with transaction.atomic():
         inventory = Inventory.objects.select_for_update().get(variant_id=variant_id)
         if inventory.available_quantity < qty:
@@ -9,9 +24,58 @@ def reserve_stock(variant_id, qty):
 
         inventory.reserved_quantity += qty
         inventory.save()
+        notify_availability([variant_id])
 
 def release_stock(variant_id, qty):
+    if ledger.ledger_enabled():
+        with transaction.atomic():
+            ledger.release(variant_id, qty)
+            notify_availability([variant_id])
+        return
+
     with transaction.atomic():
         inventory = Inventory.objects.select_for_update().get(variant_id=variant_id)
         inventory.reserved_quantity -= qty
         inventory.save()
+        notify_availability([variant_id])
+
+def lock_inventory(variant_ids):
+    """Lock Inventory rows in variant order; ledger mode takes the variant locks instead."""
+    if not variant_ids:
+        return
+    if ledger.ledger_enabled():
+        ledger.lock_variants(variant_ids)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id FROM {Inventory._meta.db_table} WHERE variant_id = ANY(%s) ORDER BY variant_id FOR UPDATE",
+            [sorted(variant_ids)],
+        )
+
+def release_stock_many(quantities):
+    """Release ``{variant_id: qty}`` with one UPDATE, locking rows in variant order."""
+    quantities = {variant_id: qty for variant_id, qty in quantities.items() if qty}
+    if not quantities:
+        return
+    if ledger.ledger_enabled():
+        with transaction.atomic():
+            InventoryMovement.objects.bulk_create([
+                ledger.movement(variant_id, "RELEASE", qty) for variant_id, qty in quantities.items()
+            ])
+            notify_availability(quantities)
+        return
+
+    variant_ids = sorted(quantities)
+    table = Inventory._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        lock_inventory(variant_ids)
+        cursor.execute(
+            f"""
+            UPDATE {table} i SET reserved_quantity = i.reserved_quantity - d.qty
+            FROM unnest(%s::bigint[], %s::integer[]) AS d(variant_id, qty)
+            WHERE i.variant_id = d.variant_id
+            """,
+            [variant_ids, [quantities[variant_id] for variant_id in variant_ids]],
+        )
+        notify_availability(variant_ids)
+
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from array import array
+from django.conf import settings
+from django.db import connection
+from .events import availability, events_enabled, get_availability_hub
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = -1
+
+
+class AvailabilitySnapshot:
+    """
+    Per-process copy of every variant's available quantity, held in an
+    ``array`` indexed by variant id (4 bytes per id, no per-entry objects).
+
+    A full reload reads all rows in one query; in between, inventory NOTIFYs
+    (INVENTORY_EVENTS) patch single entries through the availability hub.
+    The snapshot is reloaded when it is older than INVENTORY_SNAPSHOT_MAX_AGE
+    or the feed reconnected after the last load. Reads never touch the
+    database.
+    """
+
+    def __init__(self, hub=None):
+        self.hub = hub
+        self.loaded_at = None
+        self._values = array("i")
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._during_load = None
+        if hub is not None:
+            hub.observe(self.apply)
+
+    def _store(self, values, variant_id, available):
+        if variant_id >= len(values):
+            values.extend([UNKNOWN] * (variant_id + 1 - len(values)))
+        values[variant_id] = available
+
+    def apply(self, variant_id, available):
+        with self._lock:
+            self._store(self._values, variant_id, available)
+            if self._during_load is not None:
+                self._during_load[variant_id] = available
+
+    def reload(self):
+        with self._reload_lock:
+            with self._lock:
+                self._during_load = {}
+            started_at = time.time()
+            try:
+                levels = availability()
+            finally:
+                if not connection.in_atomic_block:
+                    connection.close()
+
+            values = array("i", [UNKNOWN]) * (max(levels, default=0) + 1)
+            for variant_id, available in levels.items():
+                values[variant_id] = available
+            with self._lock:
+                # Changes that arrived while the query ran may be newer than it.
+                for variant_id, available in self._during_load.items():
+                    self._store(values, variant_id, available)
+                self._values = values
+                self._during_load = None
+                self.loaded_at = started_at
+
+    def lookup(self, variant_ids):
+        """Return ``({variant_id: available}, as_of)`` for the known variants."""
+        with self._lock:
+            values = self._values
+            found = {
+                variant_id: values[variant_id] for variant_id in variant_ids
+                if variant_id < len(values) and values[variant_id] != UNKNOWN
+            }
+        return found, self.as_of()
+
+    def as_of(self):
+        """Time up to which the snapshot reflects every committed change."""
+        as_of = self.loaded_at
+        hub = self.hub
+        if (
+            as_of is not None and hub is not None and events_enabled()
+            and hub.connected_since is not None and hub.connected_since <= as_of
+            and hub.last_poll is not None
+        ):
+            # The change feed has been up since before the load.
+            as_of = max(as_of, hub.last_poll)
+        return as_of
+
+    def needs_reload(self):
+        if self.loaded_at is None:
+            return True
+        # With a live change feed as_of keeps moving, so this only fires
+        # when the feed is off or stalled.
+        if time.time() - self.as_of() >= settings.INVENTORY_SNAPSHOT_MAX_AGE:
+            return True
+        hub = self.hub
+        # Notifications sent while the feed was down were missed.
+        return events_enabled() and hub is not None and (hub.connected_since or 0) > self.loaded_at
+
+    def start(self):
+        threading.Thread(target=self._refresh, name="inventory-availability-snapshot", daemon=True).start()
+
+    def _refresh(self):
+        while True:
+            if self.needs_reload():
+                try:
+                    self.reload()
+                except Exception:
+                    logger.warning("Could not reload the availability snapshot", exc_info=True)
+            time.sleep(1)
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_availability_snapshot():
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            hub = get_availability_hub() if events_enabled() else None
+            _snapshot = AvailabilitySnapshot(hub)
+            _snapshot.reload()
+            _snapshot.start()
+    return _snapshot
@@ -0,0 +1,333 @@
+import bisect
+import multiprocessing
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import OperationalError, connection, connections
+from django.db.models import Sum
+from django.utils import timezone
+from apps.cart.models import Cart, CartItem, ReservationHold
+from apps.cart import holds
+from apps.cart.services import add_reserved_item, checkout
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from tasks.inventory_cleanup import release_expired_reservations
+from .models import Inventory
+from .services import release_stock, reserve_stock
+from . import ledger
+
+OPERATIONS = ("reserve", "release", "add", "checkout", "expire")
+DEFAULT_MIX = {"reserve": 30, "release": 20, "add": 30, "checkout": 15, "expire": 5}
+# SQLSTATEs worth retrying: deadlock_detected and serialization_failure.
+RETRYABLE = {"40P01": "deadlocks", "40001": "serialization_failures"}
+# Stress carts belong to user ids from here up, one per process.
+USER_ID_BASE = 2_000_000_000
+
+
+def parse_mix(text):
+    """``"reserve=30,checkout=10"`` -> weights for every operation (0 if unnamed)."""
+    mix = dict.fromkeys(OPERATIONS, 0)
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in mix or not weight.strip().isdigit():
+            raise ValueError(f"Invalid mix entry {part!r}; expected one of {', '.join(OPERATIONS)}=<weight>")
+        mix[name.strip()] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one non-zero weight")
+    return mix
+
+
+def skewed_picker(items, skew, rng):
+    """Pick items with Zipf-like weights ``1 / rank ** skew`` (0 is uniform)."""
+    cumulative = []
+    total = 0.0
+    for rank in range(1, len(items) + 1):
+        total += 1 / rank ** skew
+        cumulative.append(total)
+    return lambda: items[min(bisect.bisect(cumulative, rng.random() * total), len(items) - 1)]
+
+
+def seed(skus, stock):
+    category = Category.objects.create(name=f"stress-{time.time_ns()}")
+    product = Product.objects.create(
+        name="stress", description="", base_price=Decimal("10.00"), status="archived", category=category
+    )
+    variants = Variant.objects.bulk_create([
+        Variant(product=product, sku=f"STRESS-{category.id}-{i}", attributes={}) for i in range(skus)
+    ])
+    Inventory.objects.bulk_create([Inventory(variant=variant, stock_quantity=stock) for variant in variants])
+    return category, product, variants
+
+
+class Worker:
+    """One process's share of the workload and its counters."""
+
+    def __init__(self, index, variants, options):
+        self.rng = random.Random(options["seed"] + index)
+        self.pick = skewed_picker(variants, options["skew"], self.rng)
+        self.user_id = USER_ID_BASE + index
+        self.max_retries = options["max_retries"]
+        self.held = defaultdict(int)
+        self.cart = None
+        self.lines = defaultdict(int)
+        self.sold = defaultdict(int)
+        self.stats = {name: {"ok": 0, "rejected": 0, "errors": 0, "latencies": []} for name in OPERATIONS}
+        self.retries = defaultdict(int)
+        self.errors = []
+
+    def run(self, operations, mix):
+        names = [name for name in OPERATIONS if mix[name]]
+        weights = [mix[name] for name in names]
+        for name in self.rng.choices(names, weights, k=operations):
+            self.call(name, getattr(self, name))
+        # Direct reservations are returned; open carts keep theirs.
+        for variant_id, qty in self.held.items():
+            self.retrying(release_stock, variant_id, qty)
+        self.held.clear()
+
+    def call(self, name, operation):
+        started = time.perf_counter()
+        try:
+            done = operation()
+        except ValueError:
+            self.stats[name]["rejected"] += 1
+            return
+        except Exception as exc:
+            self.fail(name, exc)
+            return
+        if done is not False:
+            self.stats[name]["ok"] += 1
+            self.stats[name]["latencies"].append(time.perf_counter() - started)
+
+    def retrying(self, step, *args, **kwargs):
+        """Run one transaction, retrying only it on deadlocks and serialization failures."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return step(*args, **kwargs)
+            except OperationalError as exc:
+                kind = RETRYABLE.get(getattr(exc.__cause__, "pgcode", None))
+                if kind is None or attempt == self.max_retries:
+                    raise
+                self.retries[kind] += 1
+
+    def fail(self, name, exc):
+        self.stats[name]["errors"] += 1
+        if len(self.errors) < 10:
+            self.errors.append(f"{name}: {type(exc).__name__}: {exc}")
+
+    def reserve(self):
+        variant = self.pick()
+        self.retrying(reserve_stock, variant.id, 1)
+        self.held[variant.id] += 1
+
+    def release(self):
+        held = [variant_id for variant_id, qty in self.held.items() if qty]
+        if not held:
+            return False
+        variant_id = self.rng.choice(held)
+        self.retrying(release_stock, variant_id, 1)
+        self.held[variant_id] -= 1
+
+    def add(self):
+        if self.cart is None:
+            self.cart = self.retrying(Cart.objects.create, user_id=self.user_id)
+        variant = self.pick()
+        # The reservation commits on its own; a failed line must not reserve again.
+        self.retrying(reserve_stock, variant.id, 1)
+        try:
+            self.retrying(add_reserved_item, self.cart, variant, 1, Decimal("10.00"))
+        except Exception:
+            self.held[variant.id] += 1
+            raise
+        self.lines[variant.id] += 1
+
+    def checkout(self):
+        if not self.lines:
+            return False
+        self.retrying(checkout, self.cart)
+        for variant_id, qty in self.lines.items():
+            self.sold[variant_id] += qty
+        self.cart = None
+        self.lines.clear()
+
+    def expire(self):
+        # Abandon the current cart and sweep: only abandoned carts ever
+        # expire, so sweeps never race a checkout of the same lines.
+        if self.cart is not None:
+            self.retrying(
+                CartItem.objects.filter(cart=self.cart).update,
+                reservation_expires_at=timezone.now() - timedelta(seconds=1),
+            )
+            self.cart = None
+            self.lines.clear()
+        self.retrying(release_expired_reservations)
+
+    def result(self):
+        return {"stats": self.stats, "retries": dict(self.retries), "sold": dict(self.sold), "errors": self.errors}
+
+
+def _work(index, variants, options, start, results):
+    try:
+        worker = Worker(index, variants, options)
+        start.wait()
+        try:
+            worker.run(options["operations"], options["mix"])
+        except Exception as exc:
+            worker.errors.append(f"worker: {type(exc).__name__}: {exc}")
+        results.put(worker.result())
+    finally:
+        connections.close_all()
+
+
+class LockSampler(threading.Thread):
+    """Samples backends of this database waiting on a lock."""
+
+    def __init__(self, interval=0.02):
+        super().__init__(name="stress-lock-sampler", daemon=True)
+        self.interval = interval
+        self.waiting_seconds = 0.0
+        self.peak = 0
+        self._stopping = threading.Event()
+
+    def run(self):
+        try:
+            with connection.cursor() as cursor:
+                while not self._stopping.is_set():
+                    cursor.execute(
+                        "SELECT count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                    )
+                    waiting = cursor.fetchone()[0]
+                    self.waiting_seconds += waiting * self.interval
+                    self.peak = max(self.peak, waiting)
+                    self._stopping.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopping.set()
+        self.join()
+
+
+def database_deadlocks():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+        return cursor.fetchone()[0]
+
+
+def levels(variant_ids):
+    # The Inventory snapshot plus pending movements, so it holds in ledger mode too.
+    return ledger.stock_levels(variant_ids)
+
+
+def check_invariants(initial, final, sold, in_carts):
+    """Return a list of violations for ``{variant_id: [stock, reserved]}`` before and after."""
+    violations = []
+    for variant_id, (stock, reserved) in final.items():
+        if reserved < 0:
+            violations.append(f"variant {variant_id}: reserved_quantity {reserved} is negative")
+        if reserved > stock:
+            violations.append(f"variant {variant_id}: oversold, reserved {reserved} > stock {stock}")
+        if initial[variant_id][0] - stock != sold.get(variant_id, 0):
+            violations.append(
+                f"variant {variant_id}: stock not conserved, {initial[variant_id][0] - stock} removed "
+                f"but {sold.get(variant_id, 0)} sold"
+            )
+        if reserved != in_carts.get(variant_id, 0):
+            violations.append(
+                f"variant {variant_id}: reserved {reserved} but {in_carts.get(variant_id, 0)} held by carts"
+            )
+    return violations
+
+
+def run_stress(processes=8, operations=500, skus=20, stock=1000, skew=1.0, mix=None, max_retries=3, seed_value=0):
+    """
+    Drive the mixed workload from ``processes`` forked processes against
+    freshly seeded variants, then check the stock invariants.
+
+    Returns a report with per-operation counts and latencies, throughput,
+    sampled lock wait, deadlocks (server-side and as seen by workers),
+    retries, worker errors and invariant violations. The seeded rows are
+    deleted afterwards.
+    """
+    options = {
+        "operations": operations, "mix": mix or DEFAULT_MIX, "skew": skew,
+        "max_retries": max_retries, "seed": seed_value,
+    }
+    category, product, variants = seed(skus, stock)
+    variant_ids = [variant.id for variant in variants]
+    user_ids = [USER_ID_BASE + index for index in range(processes)]
+    try:
+        initial = levels(variant_ids)
+        deadlocks_before = database_deadlocks()
+
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        start = context.Event()
+        results = context.Queue()
+        workers = [
+            context.Process(target=_work, args=(index, variants, options, start, results))
+            for index in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        sampler = LockSampler()
+        sampler.start()
+        started = time.perf_counter()
+        start.set()
+        outcomes = [results.get() for _ in workers]
+        elapsed = time.perf_counter() - started
+        for process in workers:
+            process.join()
+        sampler.stop()
+
+        sold = defaultdict(int)
+        for outcome in outcomes:
+            for variant_id, qty in outcome["sold"].items():
+                sold[variant_id] += qty
+        in_carts = dict(
+            CartItem.objects.filter(variant_id__in=variant_ids)
+            .values("variant_id").annotate(total=Sum("quantity")).values_list("variant_id", "total")
+        )
+        violations = check_invariants(initial, levels(variant_ids), sold, in_carts)
+        return report(outcomes, elapsed, sampler, database_deadlocks() - deadlocks_before, violations)
+    finally:
+        CartItem.objects.filter(variant_id__in=variant_ids).delete()
+        if holds.partitioning_enabled():
+            ReservationHold.objects.filter(variant_id__in=variant_ids).delete()
+        Cart.objects.filter(user_id__in=user_ids).delete()
+        product.delete()
+        category.delete()
+
+
+def report(outcomes, elapsed, sampler, deadlocks, violations):
+    operations = {}
+    for name in OPERATIONS:
+        latencies = sorted(latency for outcome in outcomes for latency in outcome["stats"][name]["latencies"])
+        counts = {
+            key: sum(outcome["stats"][name][key] for outcome in outcomes) for key in ("ok", "rejected", "errors")
+        }
+        counts["p50_ms"] = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+        counts["p99_ms"] = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0
+        operations[name] = counts
+    retries = defaultdict(int)
+    for outcome in outcomes:
+        for kind, count in outcome["retries"].items():
+            retries[kind] += count
+    completed = sum(counts["ok"] + counts["rejected"] for counts in operations.values())
+    return {
+        "elapsed": elapsed,
+        "throughput": completed / elapsed if elapsed else 0.0,
+        "operations": operations,
+        "lock_wait_seconds": sampler.waiting_seconds,
+        "peak_lock_waiters": sampler.peak,
+        "deadlocks": deadlocks,
+        "retries": dict(retries),
+        "errors": [error for outcome in outcomes for error in outcome["errors"]],
+        "violations": violations,
+    }
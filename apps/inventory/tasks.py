@@ -0,0 +1,12 @@
+from celery import shared_task # type: ignore
+import config.celery # noqa: F401  (binds the shared tasks to the project app)
+from . import ledger
+
+@shared_task
+def compact_inventory_ledger():
+    folded = 0
+    while True:
+        count = ledger.compact()
+        if not count:
+            return folded
+        folded += count
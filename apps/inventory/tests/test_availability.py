@@ -0,0 +1,78 @@
+import json
+import time
+import pytest # type: ignore
+from rest_framework.test import APIClient # type: ignore
+from apps.inventory import views
+from apps.inventory.events import AvailabilityHub
+from apps.inventory.models import Inventory
+from apps.inventory.services import reserve_stock
+from apps.inventory.snapshot import AvailabilitySnapshot
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def inventories():
+    category = Category.objects.create(name="Clothing")
+    product = Product.objects.create(
+        name="T-Shirt", description="Black", base_price=500, status="active", category=category
+    )
+    rows = []
+    for i, stock in enumerate((10, 3)):
+        variant = Variant.objects.create(product=product, sku=f"TSHIRT-{i}", attributes={})
+        rows.append(Inventory.objects.create(variant=variant, stock_quantity=stock))
+    return rows
+
+def test_strict_mode_reads_current_stock_in_one_query(inventories, django_assert_num_queries):
+    first, second = inventories
+    reserve_stock(first.variant_id, 4)
+    ids = f"{first.variant_id},{second.variant_id},999999"
+
+    with django_assert_num_queries(1):
+        response = APIClient().get(f"/api/inventory/availability/?variant_ids={ids}&mode=strict")
+
+    assert response.json() == {
+        "mode": "strict",
+        "stale_seconds": 0.0,
+        "availability": [
+            {"variant_id": first.variant_id, "available": 6},
+            {"variant_id": second.variant_id, "available": 3},
+        ],
+        "missing": [999999],
+    }
+
+def test_snapshot_mode_is_patched_by_the_change_feed(inventories, monkeypatch, settings, django_assert_num_queries):
+    settings.INVENTORY_EVENTS = True
+    first, _ = inventories
+    hub = AvailabilityHub(settings.INVENTORY_EVENTS_CHANNEL, interval=1)
+    snapshot = AvailabilitySnapshot(hub)
+    snapshot.reload()
+    monkeypatch.setattr(views, "get_availability_snapshot", lambda: snapshot)
+
+    hub.connected_since = snapshot.loaded_at - 1
+    hub.last_poll = time.time()
+    hub.handle(json.dumps({"variant_id": first.variant_id, "available": 2}))
+
+    with django_assert_num_queries(0):
+        response = APIClient().get(f"/api/inventory/availability/?variant_ids={first.variant_id}&mode=snapshot")
+
+    body = response.json()
+    assert body["availability"] == [{"variant_id": first.variant_id, "available": 2}]
+    assert 0 <= body["stale_seconds"] < 1
+
+def test_snapshot_goes_stale_without_feed(inventories, settings):
+    snapshot = AvailabilitySnapshot()
+    snapshot.reload()
+    assert not snapshot.needs_reload()
+
+    snapshot.loaded_at -= settings.INVENTORY_SNAPSHOT_MAX_AGE
+    assert snapshot.needs_reload()
+
+def test_rejects_bad_requests():
+    client = APIClient()
+
+    assert client.get("/api/inventory/availability/").status_code == 400
+    assert client.get("/api/inventory/availability/?variant_ids=1,a").status_code == 400
+    assert client.get("/api/inventory/availability/?variant_ids=1&mode=fast").status_code == 400
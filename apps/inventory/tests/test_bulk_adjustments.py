@@ -0,0 +1,92 @@
+import pytest # type: ignore
+from django.core.management import call_command
+from rest_framework.test import APIClient # type: ignore
+from apps.inventory import ledger
+from apps.inventory.adjustments import apply_adjustments
+from apps.inventory.models import Inventory
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def inventories():
+    category = Category.objects.create(name="Clothing")
+    product = Product.objects.create(
+        name="T-Shirt", description="Black", base_price=500, status="active", category=category
+    )
+    rows = {}
+    for sku, stock, reserved in (("TS-S", 10, 0), ("TS-M", 10, 6), ("TS-L", 0, 0)):
+        variant = Variant.objects.create(product=product, sku=sku, attributes={})
+        rows[sku] = Inventory.objects.create(variant=variant, stock_quantity=stock, reserved_quantity=reserved)
+    Variant.objects.create(product=product, sku="TS-XL", attributes={})
+    return rows
+
+def stock(sku):
+    return Inventory.objects.get(variant__sku=sku).stock_quantity
+
+def test_rows_are_applied_or_rejected_individually(inventories, django_assert_max_num_queries):
+    records = [
+        {"sku": "TS-S", "delta": 5},
+        {"sku": "TS-M", "quantity": 4},
+        {"sku": "TS-L", "quantity": 20},
+        {"sku": "TS-L", "delta": -5},
+        {"sku": "TS-XL", "delta": 1},
+        {"sku": "NOPE", "delta": 1},
+        {"sku": "TS-S", "delta": 1, "quantity": 3},
+    ]
+
+    # One SKU lookup, then per chunk one locking SELECT and one UPDATE (plus savepoint).
+    with django_assert_max_num_queries(6):
+        result = apply_adjustments(records)
+
+    assert result["applied"] == [
+        {"sku": "TS-S", "variant_id": inventories["TS-S"].variant_id, "stock_quantity": 15, "available": 15},
+        {"sku": "TS-L", "variant_id": inventories["TS-L"].variant_id, "stock_quantity": 15, "available": 15},
+    ]
+    assert sorted(row["sku"] for row in result["rejected"]) == ["NOPE", "TS-M", "TS-S", "TS-XL"]
+    assert stock("TS-M") == 10
+
+def test_out_of_range_values_reject_only_their_row(inventories):
+    result = apply_adjustments([
+        {"sku": "TS-S", "delta": 2 ** 31},
+        {"sku": "TS-M", "quantity": 2 ** 40},
+        {"sku": "TS-L", "delta": 2 ** 31 - 1},
+        {"sku": "TS-L", "delta": 1},
+        {"sku": "TS-XL", "delta": 0},
+        {"sku": "TS-S", "delta": 1},
+    ])
+
+    assert [row["sku"] for row in result["applied"]] == ["TS-S"]
+    assert sorted(row["sku"] for row in result["rejected"]) == ["TS-L", "TS-M", "TS-S", "TS-XL"]
+    assert stock("TS-S") == 11
+    assert stock("TS-L") == 0
+
+def test_chunks_apply_in_variant_order(inventories):
+    result = apply_adjustments([{"sku": sku, "delta": 1} for sku in ("TS-L", "TS-S", "TS-M")], chunk_size=1)
+
+    assert [row["sku"] for row in result["applied"]] == ["TS-S", "TS-M", "TS-L"]
+    assert [stock(sku) for sku in ("TS-S", "TS-M", "TS-L")] == [11, 11, 1]
+
+def test_ledger_mode_records_movements(inventories, settings):
+    settings.INVENTORY_LEDGER = True
+
+    result = apply_adjustments([{"sku": "TS-S", "quantity": 7}, {"sku": "TS-M", "delta": -5}])
+
+    assert [row["stock_quantity"] for row in result["applied"]] == [7]
+    variant_id = inventories["TS-S"].variant_id
+    assert ledger.stock_levels([variant_id])[variant_id] == [7, 0]
+
+def test_endpoint_and_command(inventories, tmp_path, capsys):
+    response = APIClient().post(
+        "/api/inventory/adjustments/", {"adjustments": [{"sku": "TS-S", "delta": -2}]}, format="json"
+    )
+    assert response.json()["applied"][0]["stock_quantity"] == 8
+    assert APIClient().post("/api/inventory/adjustments/", {"adjustments": []}, format="json").status_code == 400
+
+    path = tmp_path / "restock.csv"
+    path.write_text("sku,delta\nTS-S,2\nTS-M,-9\n")
+    call_command("adjust_inventory", str(path))
+    assert "1 applied, 1 rejected" in capsys.readouterr().out
+    assert stock("TS-S") == 10
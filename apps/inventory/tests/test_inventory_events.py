@@ -0,0 +1,111 @@
+import json
+import select
+import time
+import pytest # type: ignore
+from django.db import connection, connections
+from django.test import Client
+from apps.inventory import ledger, views
+from apps.inventory.events import AvailabilityHub
+from apps.inventory.models import Inventory
+from apps.inventory.services import release_stock, release_stock_many, reserve_stock
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+def setup_inventory(sku="TSHIRT-BLK-M", stock=10):
+    category = Category.objects.create(name="Clothing")
+    product = Product.objects.create(
+        name="T-Shirt", description="Black", base_price=500, status="active", category=category
+    )
+    variant = Variant.objects.create(product=product, sku=sku, attributes={"size": "M"})
+    return Inventory.objects.create(variant=variant, stock_quantity=stock)
+
+def test_hub_coalesces_updates_per_interval():
+    hub = AvailabilityHub("inventory_availability", interval=1)
+    watching = hub.subscribe([1, 2])
+    other = hub.subscribe([3])
+
+    for available in (9, 8, 7):
+        hub.handle(json.dumps({"variant_id": 1, "available": available}))
+    hub.handle(json.dumps({"variant_id": 3, "available": 4}))
+    hub.flush()
+
+    assert watching.get(timeout=0) == {1: 7}
+    assert other.get(timeout=0) == {3: 4}
+    other.close()
+    hub.handle(json.dumps({"variant_id": 3, "available": 2}))
+    hub.flush()
+    assert other.get(timeout=0) == {}
+
+@pytest.mark.django_db(transaction=True)
+def test_stock_changes_notify_on_commit(settings):
+    settings.INVENTORY_EVENTS = True
+    inventory = setup_inventory(stock=10)
+    listener = connections.create_connection("default")
+    listener.ensure_connection()
+    try:
+        with listener.connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{settings.INVENTORY_EVENTS_CHANNEL}"')
+
+        reserve_stock(inventory.variant_id, 3)
+        release_stock(inventory.variant_id, 1)
+
+        raw = listener.connection
+        deadline = time.time() + 5
+        while len(raw.notifies) < 2 and time.time() < deadline:
+            select.select([raw], [], [], 0.1)
+            raw.poll()
+        events = [json.loads(notify.payload) for notify in raw.notifies]
+    finally:
+        listener.close()
+
+    assert events == [
+        {"variant_id": inventory.variant_id, "available": 7},
+        {"variant_id": inventory.variant_id, "available": 8},
+    ]
+
+@pytest.mark.django_db
+def test_stream_sends_snapshot_then_updates(monkeypatch, settings):
+    settings.INVENTORY_EVENTS = True
+    inventory = setup_inventory(stock=5)
+    hub = AvailabilityHub("inventory_availability", interval=1)
+    monkeypatch.setattr(views, "get_availability_hub", lambda: hub)
+
+    response = Client().get(f"/api/inventory/stream/?variant_ids={inventory.variant_id}")
+    chunks = iter(response.streaming_content)
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert next(chunks).decode() == (
+        f'event: availability\ndata: [{{"variant_id": {inventory.variant_id}, "available": 5}}]\n\n'
+    )
+    hub.handle(json.dumps({"variant_id": inventory.variant_id, "available": 4}))
+    hub.flush()
+    assert '"available": 4' in next(chunks).decode()
+    response.close()
+    assert Client().get("/api/inventory/stream/?variant_ids=x").status_code == 400
+
+@pytest.mark.django_db
+def test_stream_is_unavailable_without_events(settings):
+    settings.INVENTORY_EVENTS = False
+
+    response = Client().get("/api/inventory/stream/?variant_ids=1")
+
+    assert response.status_code == 404
+    assert not response.streaming
+
+@pytest.mark.django_db
+def test_ledger_notifications_are_computed_under_the_variant_lock(settings):
+    settings.INVENTORY_EVENTS = True
+    settings.INVENTORY_LEDGER = True
+    inventory = setup_inventory(stock=10)
+    Inventory.objects.filter(pk=inventory.pk).update(reserved_quantity=3)
+
+    release_stock_many({inventory.variant_id: 1})
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid() "
+            "AND classid = %s AND objid = %s",
+            [ledger.LOCK_NAMESPACE, inventory.variant_id],
+        )
+        assert cursor.fetchone()[0] == 1
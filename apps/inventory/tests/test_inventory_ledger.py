@@ -0,0 +1,80 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.inventory import ledger
+from apps.inventory.models import Inventory, InventoryMovement
+from apps.inventory.services import release_stock, reserve_stock
+from apps.cart.models import Cart, CartItem
+from apps.cart.services import add_to_cart, checkout, release_cart_items
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture(autouse=True)
+def ledger_mode(settings):
+    settings.INVENTORY_LEDGER = True
+
+def setup_inventory(stock=10):
+    category = Category.objects.create(name="Clothing")
+    product = Product.objects.create(name="T-Shirt", description="Black", base_price=500, status="active", category=category)
+    variant = Variant.objects.create(product=product, sku="TSHIRT-BLK-L", attributes={"size": "L"})
+    return Inventory.objects.create(variant=variant, stock_quantity=stock)
+
+def test_movements_leave_snapshot_untouched_until_compaction():
+    inventory = setup_inventory(stock=10)
+    variant_id = inventory.variant_id
+
+    cart = Cart.objects.create(user_id=1)
+    add_to_cart(cart, inventory.variant, 4, Decimal("500.00"))
+    reserve_stock(variant_id, 3)
+    release_stock(variant_id, 3)
+    checkout(cart)
+
+    inventory.refresh_from_db()
+    assert (inventory.stock_quantity, inventory.reserved_quantity) == (10, 0)
+    assert ledger.stock_levels([variant_id])[variant_id] == [6, 0]
+    assert list(InventoryMovement.objects.values_list("kind", flat=True).order_by("id")) == [
+        "RESERVE", "RESERVE", "RELEASE", "SALE",
+    ]
+
+    assert ledger.compact() == 4
+    assert ledger.compact() == 0
+    inventory.refresh_from_db()
+    assert (inventory.stock_quantity, inventory.reserved_quantity) == (6, 0)
+    assert ledger.stock_levels([variant_id])[variant_id] == [6, 0]
+
+def test_released_items_take_the_variant_lock_before_deleting(settings):
+    settings.INVENTORY_EVENTS = True
+    inventory = setup_inventory(stock=10)
+    add_to_cart(Cart.objects.create(user_id=1), inventory.variant, 2, Decimal("500.00"))
+
+    with CaptureQueriesContext(connection) as queries:
+        assert release_cart_items(list(CartItem.objects.values_list("id", flat=True))) == 1
+
+    statements = [query["sql"] for query in queries]
+    locked = next(i for i, sql in enumerate(statements) if "pg_advisory_xact_lock" in sql)
+    deleted = next(i for i, sql in enumerate(statements) if sql.startswith("DELETE"))
+    # The order checkout takes them in: variant locks first, then the items.
+    assert locked < deleted
+    assert ledger.stock_levels([inventory.variant_id])[inventory.variant_id] == [10, 0]
+
+def test_reserve_checks_pending_movements():
+    inventory = setup_inventory(stock=5)
+
+    reserve_stock(inventory.variant_id, 4)
+    with pytest.raises(ValueError):
+        reserve_stock(inventory.variant_id, 2)
+
+def test_stock_can_be_rebuilt_at_a_point_in_time():
+    inventory = setup_inventory(stock=10)
+    reserve_stock(inventory.variant_id, 2)
+    before_restock = timezone.now()
+    ledger.restock(inventory.variant_id, 5)
+    ledger.compact()
+
+    assert ledger.stock_at(inventory.variant_id, before_restock) == (10, 2)
+    assert ledger.stock_at(inventory.variant_id, timezone.now()) == (15, 2)
@@ -61,3 +61,25 @@ def test_concurrent_reservations_no_oversell():
     assert inventory.reserved_quantity <= 10
     assert list(results.values()).count("SUCCESS") == 3
     assert list(results.values()).count("FAIL") == 2
+
+def test_coalesced_reservations_no_oversell(settings):
+    settings.INVENTORY_RESERVATION_COALESCE_MS = 20
+    inventory = setup_inventory(stock=10)
+
+    results = {}
+    threads = [
+        threading.Thread(target=try_reserve, args=(inventory, 3, results, i))
+        for i in range(5)
+    ]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    inventory.refresh_from_db()
+
+    assert inventory.reserved_quantity == 9
+    assert list(results.values()).count("SUCCESS") == 3
+    assert list(results.values()).count("FAIL") == 2
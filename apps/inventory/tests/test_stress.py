@@ -0,0 +1,63 @@
+import random
+import pytest # type: ignore
+from django.db import OperationalError
+from apps.cart.models import CartItem
+from apps.inventory import stress
+from apps.inventory.models import Inventory
+from apps.inventory.stress import Worker, check_invariants, parse_mix, run_stress, seed, skewed_picker
+
+@pytest.mark.django_db(transaction=True)
+def test_processes_keep_stock_invariants():
+    result = run_stress(processes=3, operations=40, skus=4, stock=10, skew=1.0)
+
+    assert result["violations"] == []
+    assert result["errors"] == []
+    operations = result["operations"]
+    assert sum(counts["ok"] + counts["rejected"] for counts in operations.values()) > 0
+    assert operations["checkout"]["ok"] > 0
+    assert not Inventory.objects.exists()
+
+@pytest.mark.django_db
+def test_deadlocked_cart_line_does_not_reserve_twice(monkeypatch):
+    _, _, variants = seed(skus=1, stock=10)
+    add_reserved_item = stress.add_reserved_item
+    calls = []
+
+    def deadlock_once(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            cause = Exception("deadlock detected")
+            cause.pgcode = "40P01"
+            raise OperationalError("deadlock detected") from cause
+        return add_reserved_item(*args)
+
+    monkeypatch.setattr(stress, "add_reserved_item", deadlock_once)
+    worker = Worker(0, variants, {"seed": 0, "skew": 0, "max_retries": 3})
+    worker.call("add", worker.add)
+
+    assert worker.errors == []
+    assert worker.retries == {"deadlocks": 1}
+    assert worker.stats["add"]["ok"] == 1
+    assert Inventory.objects.get(variant=variants[0]).reserved_quantity == 1
+    assert CartItem.objects.filter(variant=variants[0]).count() == 1
+
+def test_invariant_violations_are_reported():
+    initial = {1: [10, 0], 2: [10, 0]}
+    final = {1: [7, 8], 2: [9, 1]}
+
+    violations = check_invariants(initial, final, sold={1: 3}, in_carts={1: 8})
+
+    assert violations == [
+        "variant 1: oversold, reserved 8 > stock 7",
+        "variant 2: stock not conserved, 1 removed but 0 sold",
+        "variant 2: reserved 1 but 0 held by carts",
+    ]
+
+def test_skew_and_mix():
+    pick = skewed_picker(["hot", "warm", "cold"], 2.0, random.Random(0))
+    picks = [pick() for _ in range(1000)]
+    assert picks.count("hot") > picks.count("warm") > picks.count("cold")
+
+    assert parse_mix("reserve=3,checkout=1")["checkout"] == 1
+    with pytest.raises(ValueError):
+        parse_mix("reserve=3,refund=1")
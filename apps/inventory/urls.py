@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import AdjustmentsView, AvailabilityStreamView, AvailabilityView
+
+urlpatterns = [
+    path("adjustments/", AdjustmentsView.as_view()),
+    path("availability/", AvailabilityView.as_view()),
+    path("stream/", AvailabilityStreamView.as_view()),
+]
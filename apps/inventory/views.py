@@ -0,0 +1,122 @@
+import json
+import time
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import status # type: ignore
+from rest_framework.response import Response # type: ignore
+from rest_framework.views import APIView # type: ignore
+from .adjustments import apply_adjustments
+from .events import availability, events_enabled, get_availability_hub
+from .snapshot import get_availability_snapshot
+
+
+def parse_variant_ids(raw, limit):
+    """Parse ``?variant_ids=1,2,3``; returns None when malformed or over ``limit``."""
+    try:
+        variant_ids = sorted({int(value) for value in (raw or "").split(",") if value.strip()})
+    except ValueError:
+        return None
+    if not variant_ids or len(variant_ids) > limit or variant_ids[0] < 0:
+        return None
+    return variant_ids
+
+
+class AvailabilityView(APIView):
+    """
+    Available quantities for up to INVENTORY_AVAILABILITY_MAX_VARIANTS
+    variants. ``mode=strict`` reads the database (one query);
+    ``mode=snapshot`` answers from the per-process snapshot and reports how
+    stale it may be. Variants without inventory are listed in ``missing``.
+    """
+
+    def get(self, request):
+        limit = settings.INVENTORY_AVAILABILITY_MAX_VARIANTS
+        variant_ids = parse_variant_ids(request.query_params.get("variant_ids"), limit)
+        if variant_ids is None:
+            return Response(
+                {"error": f"variant_ids must list 1 to {limit} variant ids"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        mode = request.query_params.get("mode", settings.INVENTORY_AVAILABILITY_MODE)
+        if mode == "strict":
+            levels, stale_seconds = availability(variant_ids), 0.0
+        elif mode == "snapshot":
+            levels, as_of = get_availability_snapshot().lookup(variant_ids)
+            stale_seconds = round(max(time.time() - as_of, 0.0), 3)
+        else:
+            return Response({"error": "mode must be strict or snapshot"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "mode": mode,
+            "stale_seconds": stale_seconds,
+            "availability": [
+                {"variant_id": variant_id, "available": available} for variant_id, available in sorted(levels.items())
+            ],
+            "missing": [variant_id for variant_id in variant_ids if variant_id not in levels],
+        })
+
+
+class AdjustmentsView(APIView):
+    """
+    Bulk stock adjustment: ``{"adjustments": [{"sku": ..., "delta": 5},
+    {"sku": ..., "quantity": 100}]}``. Rows are applied or rejected one by
+    one; the response lists both.
+    """
+
+    def post(self, request):
+        records = request.data.get("adjustments") if isinstance(request.data, dict) else None
+        limit = settings.INVENTORY_ADJUST_MAX_RECORDS
+        if not isinstance(records, list) or not records or len(records) > limit:
+            return Response(
+                {"error": f"adjustments must be a list of 1 to {limit} records"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(apply_adjustments(records))
+
+
+def sse_event(levels):
+    data = [{"variant_id": variant_id, "available": available} for variant_id, available in sorted(levels.items())]
+    return f"event: availability\ndata: {json.dumps(data)}\n\n"
+
+
+class AvailabilityStreamView(View):
+    """
+    Server-Sent Events stream of available quantities for ``?variant_ids=``.
+
+    The first event is the current availability; after that an event is sent
+    whenever stock changes (at most one per variant per
+    INVENTORY_EVENTS_INTERVAL), with a comment line as heartbeat. Answers
+    404 when INVENTORY_EVENTS is off.
+    """
+
+    def get(self, request):
+        if not events_enabled():
+            # Without the change feed the stream would only ever send heartbeats.
+            return JsonResponse({"error": "The availability stream is disabled"}, status=404)
+        variant_ids = parse_variant_ids(request.GET.get("variant_ids"), settings.INVENTORY_STREAM_MAX_VARIANTS)
+        if variant_ids is None:
+            return JsonResponse(
+                {"error": f"variant_ids must list 1 to {settings.INVENTORY_STREAM_MAX_VARIANTS} variant ids"},
+                status=400,
+            )
+
+        # Subscribe before reading the snapshot so no change falls in between.
+        subscription = get_availability_hub().subscribe(variant_ids)
+        snapshot = availability(variant_ids)
+        if not connection.in_atomic_block:
+            # The stream may stay open for minutes; do not hold a connection.
+            connection.close()
+
+        response = StreamingHttpResponse(self.stream(subscription, snapshot), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def stream(self, subscription, snapshot):
+        try:
+            yield sse_event(snapshot)
+            while True:
+                updates = subscription.get(timeout=settings.INVENTORY_STREAM_HEARTBEAT)
+                yield sse_event(updates) if updates else ": keepalive\n\n"
+        finally:
+            subscription.close()
@@ -1,57 +1,228 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+from apps.products import cache
 from .models import PricingRule
 
+logger = logging.getLogger(__name__)
+
+
+def get_active_rules():
+    return cache.cached(
+        "pricing", "active-rules",
+        lambda: list(PricingRule.objects.filter(is_active=True).order_by("priority")),
+    )
+
+
+class PricingStats:
+    """
+    Per-process counters: per rule evaluations, matches, skips, total
+    discount and evaluation time; for shadow runs samples, mismatches,
+    errors, samples dropped and the time spent by each engine.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.rules = {}
+            self.shadow = {
+                "samples": 0, "mismatches": 0, "errors": 0, "dropped": 0,
+                "live_seconds": 0.0, "shadow_seconds": 0.0,
+            }
+
+    def record_rules(self, trace):
+        with self._lock:
+            for entry in trace:
+                counters = self.rules.setdefault(entry["rule_id"], {
+                    "type": entry["type"], "evaluated": 0, "matched": 0, "skipped": 0,
+                    "discount": 0.0, "seconds": 0.0,
+                })
+                counters["evaluated"] += 1
+                counters["matched" if entry["matched"] else "skipped"] += 1
+                counters["discount"] += entry["discount"]
+                counters["seconds"] += entry["seconds"]
+
+    def record_shadow(self, live_seconds, shadow_seconds=0.0, mismatch=False, error=False):
+        with self._lock:
+            self.shadow["samples"] += 1
+            self.shadow["mismatches"] += mismatch
+            self.shadow["errors"] += error
+            self.shadow["live_seconds"] += live_seconds
+            self.shadow["shadow_seconds"] += shadow_seconds
+
+    def record_dropped(self):
+        with self._lock:
+            self.shadow["dropped"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "rules": {rule_id: dict(counters) for rule_id, counters in self.rules.items()},
+                "shadow": dict(self.shadow),
+            }
+
+
+stats = PricingStats()
+
+
 class PricingEngine:
+    """
+    Applies the active rules in priority order.
+
+    With ``trace`` (default PRICING_TRACE) every rule's outcome and
+    evaluation time is recorded in ``stats`` and kept in ``last_trace``.
+    A PRICING_SHADOW_SAMPLE_RATE share of calls also runs the
+    PRICING_SHADOW_ENGINE candidate on the same input in a background
+    thread and logs any difference; the live result is returned without
+    waiting for it. Candidates
+    subclass this and override ``get_rules`` and/or ``evaluate``.
+    """
+
+    def __init__(self, trace=None):
+        self.trace = settings.PRICING_TRACE if trace is None else trace
+        self.last_trace = None
+
+    def get_rules(self):
+        """The active rules as this call's own objects, free to modify."""
+        return get_active_rules()
+
     def calculate(self, base_price, quantity, user_tier=None):
+        started = time.perf_counter()
+        price, breakdown, trace = self.evaluate(base_price, quantity, user_tier, self.trace)
+        live_seconds = time.perf_counter() - started
+
+        if trace is not None:
+            self.last_trace = trace
+            stats.record_rules(trace)
+        if settings.PRICING_SHADOW_ENGINE and random.random() < settings.PRICING_SHADOW_SAMPLE_RATE:
+            submit_shadow(self._shadow, base_price, quantity, user_tier, price, breakdown, live_seconds)
+        return price, breakdown
+
+    def evaluate(self, base_price, quantity, user_tier=None, trace=False):
+        """Return ``(price, breakdown, trace)``; trace is None unless requested."""
         price = base_price * quantity
         breakdown = []
+        entries = [] if trace else None
 
-        rules = PricingRule.objects.filter(is_active=True).order_by("priority")
-
-        for rule in rules:
-            if rule.rule_type == "BULK":
-                if quantity >= rule.config["min_qty"]:
-                    discount = price * rule.config["discount_percent"] / 100
-                    price -= discount
-                    breakdown.append({
-                        "type": "BULK",
-                        "discount": float(discount)
-                    })
-
-            if rule.rule_type == "USER_TIER" and user_tier:
-                if user_tier == rule.config["tier"]:
-                    discount = price * rule.config["discount_percent"] / 100
-                    price -= discount
-                    breakdown.append({
-                        "type": "USER_TIER",
-                        "discount": float(discount)
-                    })
-
-            if rule.rule_type == "SEASONAL":
-                if self._is_seasonal_active(rule):
-                    discount = price * rule.config["discount_percent"] / 100
-                    price -= discount
-                    breakdown.append({
-                        "type": "SEASONAL",
-                        "discount": float(discount)
-                    })
-
-        return round(price, 2), breakdown
+        for rule in self.get_rules():
+            if trace:
+                started = time.perf_counter()
+            matched = self._matches(rule, quantity, user_tier)
+            discount = 0
+            if matched:
+                discount = price * rule.config["discount_percent"] / 100
+                price -= discount
+                breakdown.append({
+                    "type": rule.rule_type,
+                    "discount": float(discount)
+                })
+            if trace:
+                entries.append({
+                    "rule_id": rule.id,
+                    "type": rule.rule_type,
+                    "priority": rule.priority,
+                    "matched": matched,
+                    "discount": float(discount),
+                    "seconds": time.perf_counter() - started,
+                })
+
+        return round(price, 2), breakdown, entries
+
+    def _matches(self, rule, quantity, user_tier):
+        if rule.rule_type == "BULK":
+            return quantity >= rule.config["min_qty"]
+        if rule.rule_type == "USER_TIER":
+            return bool(user_tier) and user_tier == rule.config["tier"]
+        if rule.rule_type == "SEASONAL":
+            return self._is_seasonal_active(rule)
+        return False
+
+    def _shadow(self, base_price, quantity, user_tier, price, breakdown, live_seconds):
+        started = time.perf_counter()
+        try:
+            shadow_price, shadow_breakdown, _ = get_shadow_engine().evaluate(base_price, quantity, user_tier)
+        except Exception:
+            stats.record_shadow(live_seconds, error=True)
+            logger.warning("Shadow pricing engine failed", exc_info=True)
+            return
+        shadow_seconds = time.perf_counter() - started
+
+        mismatch = shadow_price != price or shadow_breakdown != breakdown
+        stats.record_shadow(live_seconds, shadow_seconds, mismatch=mismatch)
+        if mismatch:
+            logger.warning(
+                "Shadow pricing differs: base_price=%s quantity=%s user_tier=%s live=%s %s shadow=%s %s",
+                base_price, quantity, user_tier, price, breakdown, shadow_price, shadow_breakdown,
+            )
+        logger.info("Shadow pricing: live %.6fs, shadow %.6fs", live_seconds, shadow_seconds)
 
     def _is_seasonal_active(self, rule):
         from django.utils import timezone
         from datetime import datetime
-        
+
         if not rule.config.get("start_date") or not rule.config.get("end_date"):
             return False
-            
+
         now = timezone.now()
         start = datetime.fromisoformat(rule.config["start_date"])
         end = datetime.fromisoformat(rule.config["end_date"])
-        
+
         # Ensure primitive comparison works by making naive datetimes aware if needed
         if timezone.is_aware(now) and timezone.is_naive(start):
             start = timezone.make_aware(start)
         if timezone.is_aware(now) and timezone.is_naive(end):
             end = timezone.make_aware(end)
-            
+
         return start <= now <= end
+
+
+_shadow_engine = None
+_shadow_path = None
+
+
+def get_shadow_engine():
+    global _shadow_engine, _shadow_path
+    if _shadow_path != settings.PRICING_SHADOW_ENGINE:
+        _shadow_engine = import_string(settings.PRICING_SHADOW_ENGINE)(trace=False)
+        _shadow_path = settings.PRICING_SHADOW_ENGINE
+    return _shadow_engine
+
+
+_shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pricing-shadow")
+_shadow_pending = 0
+_shadow_lock = threading.Lock()
+
+
+def submit_shadow(run, *args):
+    """Queue a shadow run; samples are dropped while PRICING_SHADOW_MAX_PENDING are queued."""
+    global _shadow_pending
+    with _shadow_lock:
+        if _shadow_pending >= settings.PRICING_SHADOW_MAX_PENDING:
+            stats.record_dropped()
+            return
+        _shadow_pending += 1
+
+    def task():
+        global _shadow_pending
+        try:
+            run(*args)
+        finally:
+            with _shadow_lock:
+                _shadow_pending -= 1
+            # Shadow engines that load rules uncached must not hold a connection.
+            connection.close()
+
+    _shadow_executor.submit(task)
+
+
+def flush_shadow():
+    """Wait for the queued shadow runs to finish."""
+    _shadow_executor.submit(lambda: None).result()
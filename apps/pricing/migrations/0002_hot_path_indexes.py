@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:53
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes to the hot tables.
+    atomic = False
+
+    dependencies = [
+        ('pricing', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='pricingrule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['priority'], name='pricingrule_active_priority'),
+        ),
+    ]
@@ -11,3 +11,9 @@ class PricingRule(models.Model):
     priority = models.IntegerField()
     config = models.JSONField()
     is_active = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # PricingEngine reads the active rules in priority order.
+            models.Index(fields=["priority"], condition=models.Q(is_active=True), name="pricingrule_active_priority"),
+        ]
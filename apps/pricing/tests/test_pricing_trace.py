@@ -0,0 +1,117 @@
+import time
+from decimal import Decimal
+import pytest # type: ignore
+from django.core.cache.backends.locmem import LocMemCache
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient # type: ignore
+from apps.pricing.engine import PricingEngine, flush_shadow, stats
+from apps.pricing.models import PricingRule
+from apps.products import cache
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+
+pytestmark = pytest.mark.django_db
+
+
+class DoubleBulkEngine(PricingEngine):
+    def get_rules(self):
+        rules = super().get_rules()
+        for rule in rules:
+            rule.config = {**rule.config, "discount_percent": rule.config["discount_percent"] * 2}
+        return rules
+
+
+class SlowEngine(PricingEngine):
+    def evaluate(self, *args, **kwargs):
+        time.sleep(0.5)
+        return super().evaluate(*args, **kwargs)
+
+
+@pytest.fixture
+def rules(settings):
+    settings.CATALOG_CACHE_ENABLED = False
+    stats.reset()
+    return [
+        PricingRule.objects.create(rule_type="BULK", priority=1, config={"min_qty": 10, "discount_percent": 10}),
+        PricingRule.objects.create(rule_type="USER_TIER", priority=2, config={"tier": "GOLD", "discount_percent": 5}),
+    ]
+
+@pytest.fixture
+def shadow(settings, monkeypatch):
+    # Shadow runs in a background thread; serve it the rules from a warm
+    # in-memory cache rather than a separate database connection.
+    settings.CATALOG_CACHE_ENABLED = True
+    monkeypatch.setattr(cache, "_catalog_cache", cache.TwoTierCache(LocMemCache("pricing-trace-test", {})))
+    settings.PRICING_SHADOW_ENGINE = f"{__name__}.DoubleBulkEngine"
+    settings.PRICING_SHADOW_SAMPLE_RATE = 1
+
+def test_trace_records_per_rule_counters(rules):
+    bulk, tier = rules
+    engine = PricingEngine(trace=True)
+
+    assert engine.calculate(Decimal("10.00"), 10) == (Decimal("90.00"), [{"type": "BULK", "discount": 10.0}])
+    engine.calculate(Decimal("10.00"), 1, "GOLD")
+
+    assert [(entry["rule_id"], entry["matched"]) for entry in engine.last_trace] == [(bulk.id, False), (tier.id, True)]
+    counters = stats.snapshot()["rules"]
+    assert counters[bulk.id]["evaluated"] == 2
+    assert counters[bulk.id]["matched"] == 1
+    assert counters[bulk.id]["discount"] == 10.0
+    assert counters[tier.id]["skipped"] == 1
+
+def test_untraced_calls_record_nothing(rules):
+    PricingEngine(trace=False).calculate(Decimal("10.00"), 10)
+
+    assert stats.snapshot()["rules"] == {}
+
+def test_shadow_engine_differences_are_counted(rules, shadow):
+    price, _ = PricingEngine().calculate(Decimal("10.00"), 10)
+    PricingEngine().calculate(Decimal("10.00"), 1)
+    flush_shadow()
+
+    assert price == Decimal("90.00")
+    shadow = stats.snapshot()["shadow"]
+    assert (shadow["samples"], shadow["mismatches"], shadow["errors"]) == (2, 1, 0)
+
+def test_price_view_returns_trace_to_staff(rules):
+    category = Category.objects.create(name="Clothing")
+    product = Product.objects.create(name="T-Shirt", description="", base_price=10, status="active", category=category)
+
+    url = f"/api/pricing/{product.id}/price/?quantity=10&trace=1"
+    assert "trace" not in APIClient().get(url).json()
+    assert stats.snapshot()["rules"] == {}
+
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user("ops", is_staff=True))
+    body = client.get(url).json()
+
+    assert [entry["matched"] for entry in body["trace"]] == [True, False]
+    assert client.get("/api/pricing/stats/").json()["rules"][str(rules[0].id)]["matched"] == 1
+
+def test_stats_are_restricted_to_staff(rules, settings):
+    settings.DEBUG = False
+
+    assert APIClient().get("/api/pricing/stats/").status_code == 403
+
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user("ops", is_staff=True))
+    assert client.get("/api/pricing/stats/").status_code == 200
+
+def test_shadow_engine_cannot_change_live_prices(rules, shadow):
+    prices = []
+    for _ in range(3):
+        prices.append(PricingEngine().calculate(Decimal("10.00"), 10)[0])
+        flush_shadow()
+
+    assert prices == [Decimal("90.00")] * 3
+    assert stats.snapshot()["shadow"]["mismatches"] == 3
+
+def test_shadow_runs_off_the_request_path(rules, shadow, settings):
+    settings.PRICING_SHADOW_ENGINE = f"{__name__}.SlowEngine"
+
+    started = time.perf_counter()
+    PricingEngine().calculate(Decimal("10.00"), 10)
+    assert time.perf_counter() - started < 0.25
+
+    flush_shadow()
+    assert stats.snapshot()["shadow"]["samples"] == 1
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import ProductPriceView
+from .views import PricingStatsView, ProductPriceView
 
 urlpatterns = [
+    path("stats/", PricingStatsView.as_view()),
     path("<int:product_id>/price/", ProductPriceView.as_view()),
 ]
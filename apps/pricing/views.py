@@ -1,19 +1,39 @@
+from decimal import Decimal
+from django.conf import settings
+from rest_framework import status # type: ignore
 from rest_framework.views import APIView # type: ignore
 from rest_framework.response import Response # type: ignore
+from apps.products import cache
 from apps.products.models.product import Product
-from .engine import PricingEngine
+from apps.products.serializers.product import ProductSerializer
+from .engine import PricingEngine, stats
 
 class ProductPriceView(APIView):
     def get(self, request, product_id):
         qty = int(request.query_params.get("quantity", 1))
         user_tier = request.query_params.get("user_tier")
 
-        product = Product.objects.get(id=product_id)
-        engine = PricingEngine()
+        # Shares the cached product detail representation.
+        product = cache.cached(
+            "product", product_id, lambda: dict(ProductSerializer(Product.objects.get(id=product_id)).data)
+        )
+        # Traces expose rule internals and feed the process-wide counters.
+        trace = request.query_params.get("trace") == "1" and (settings.DEBUG or request.user.is_staff)
+        engine = PricingEngine(trace=trace or None)
 
-        price, breakdown = engine.calculate(product.base_price, qty, user_tier)
+        price, breakdown = engine.calculate(Decimal(product["base_price"]), qty, user_tier)
 
-        return Response({
+        body = {
             "final_price": price,
             "breakdown": breakdown
-        })
+        }
+        if trace:
+            body["trace"] = engine.last_trace
+        return Response(body)
+
+class PricingStatsView(APIView):
+    def get(self, request):
+        # Same rule internals as ?trace=1, so the same audience.
+        if not (settings.DEBUG or request.user.is_staff):
+            return Response({"error": "Pricing stats are restricted to staff"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(stats.snapshot())
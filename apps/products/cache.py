@@ -0,0 +1,255 @@
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MISS = object()
+
+
+class LocalLRU:
+    """Bounded, thread-safe in-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISS, None
+            version, value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return MISS, None
+            self._data.move_to_end(key)
+            return value, version
+
+    def set(self, key, version, value):
+        with self._lock:
+            self._data[key] = (version, value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TwoTierCache:
+    """
+    Read-through cache: a local LRU in front of a shared (Redis) Django cache.
+
+    Entries live under a namespace ("product", "variant", "category",
+    "pricing") whose version is part of the shared key, so a whole namespace
+    can be invalidated by bumping its version. Invalidations are broadcast on
+    a Redis channel so every process drops its local copies; local entries
+    also expire after a few seconds in case a message is missed. Concurrent
+    misses for one key share a single fill, in-process and (through a short
+    lock key in the shared cache) across processes. Callers always get
+    their own copy of a value, so mutating it never touches the cache.
+    """
+
+    FILL_LOCK_TIMEOUT = 5
+
+    def __init__(self, remote, client=None, ttl=300, local_entries=10000, local_ttl=5, channel="catalog-cache"):
+        self.remote = remote
+        self.client = client
+        self.ttl = ttl
+        self.local = LocalLRU(local_entries, local_ttl)
+        self.local_ttl = local_ttl
+        self.channel = channel
+        self._versions = {}
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self._listener = None
+
+    # Shared-tier calls never take a request down with them.
+    def _remote(self, method, *args, default=None):
+        try:
+            return getattr(self.remote, method)(*args)
+        except Exception:
+            logger.warning("Catalog cache backend unavailable (%s)", method, exc_info=True)
+            return default
+
+    def _version_key(self, namespace):
+        return f"catalog:version:{namespace}"
+
+    def version(self, namespace):
+        cached = self._versions.get(namespace)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        version = self._remote("get", self._version_key(namespace), 0, default=None)
+        if version is None:
+            version = cached[0] if cached else 0
+        self._versions[namespace] = (version, time.monotonic() + self.local_ttl)
+        return version
+
+    def _key(self, namespace, version, ident):
+        return f"catalog:{namespace}:{version}:{ident}"
+
+    def get_or_fill(self, namespace, ident, fill):
+        self.ensure_listener()
+        ident = str(ident)
+        version = self.version(namespace)
+        value, local_version = self.local.get((namespace, ident))
+        if value is not MISS and local_version == version:
+            return copy.deepcopy(value)
+
+        key = self._key(namespace, version, ident)
+        value = self._remote("get", key, MISS, default=MISS)
+        if value is MISS:
+            value = self._single_flight(key, fill)
+        self.local.set((namespace, ident), version, value)
+        return copy.deepcopy(value)
+
+    def _single_flight(self, key, fill):
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._fill_shared(key, fill)
+            return flight.value
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _fill_shared(self, key, fill):
+        lock_key = f"{key}:filling"
+        if self._remote("add", lock_key, 1, self.FILL_LOCK_TIMEOUT, default=True) is False:
+            # Another process is filling this key; wait for its result.
+            deadline = time.monotonic() + self.FILL_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                value = self._remote("get", key, MISS, default=MISS)
+                if value is not MISS:
+                    return value
+
+        try:
+            value = fill()
+            self._remote("set", key, value, self.ttl)
+        finally:
+            # Also on a failed fill (e.g. Http404), or other processes wait it out.
+            self._remote("delete", lock_key)
+        return value
+
+    def invalidate(self, namespace, ident=None):
+        """Drop one entry, or the whole namespace when ``ident`` is None."""
+        if ident is None:
+            try:
+                version = self.remote.incr(self._version_key(namespace))
+            except ValueError:
+                # First bump: incr needs an existing key.
+                version = None
+            except Exception:
+                logger.warning("Catalog cache backend unavailable (incr)", exc_info=True)
+                version = None
+            if version is None:
+                version = self.version(namespace) + 1
+                self._remote("set", self._version_key(namespace), version, None)
+            message = {"namespace": namespace, "version": version}
+        else:
+            ident = str(ident)
+            self._remote("delete", self._key(namespace, self.version(namespace), ident))
+            message = {"namespace": namespace, "ident": ident}
+
+        self.apply_invalidation(message)
+        if self.client is not None:
+            try:
+                self.client.publish(self.channel, json.dumps(message))
+            except Exception:
+                logger.warning("Could not broadcast catalog cache invalidation", exc_info=True)
+
+    def apply_invalidation(self, message):
+        namespace = message["namespace"]
+        if "ident" in message:
+            self.local.pop((namespace, message["ident"]))
+        else:
+            self._versions[namespace] = (message["version"], time.monotonic() + self.local_ttl)
+
+    def ensure_listener(self):
+        if self.client is None or self._listener is not None:
+            return
+        self._listener = threading.Thread(target=self._listen, name="catalog-cache-invalidation", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self.apply_invalidation(json.loads(message["data"]))
+            except Exception:
+                logger.warning("Catalog cache invalidation listener lost Redis; retrying", exc_info=True)
+                time.sleep(1)
+
+
+_catalog_cache = None
+_catalog_cache_lock = threading.Lock()
+
+
+def get_catalog_cache():
+    global _catalog_cache
+    if _catalog_cache is None:
+        with _catalog_cache_lock:
+            if _catalog_cache is None:
+                import redis
+                from django.core.cache import caches
+
+                _catalog_cache = TwoTierCache(
+                    caches["default"],
+                    client=redis.Redis.from_url(settings.CACHES["default"]["LOCATION"]),
+                    ttl=settings.CATALOG_CACHE_TTL,
+                    local_entries=settings.CATALOG_CACHE_LOCAL_MAX_ENTRIES,
+                    local_ttl=settings.CATALOG_CACHE_LOCAL_TTL,
+                    channel=settings.CATALOG_CACHE_CHANNEL,
+                )
+    return _catalog_cache
+
+
+def cached(namespace, ident, fill):
+    if not settings.CATALOG_CACHE_ENABLED:
+        return fill()
+
+    def fill_from_primary():
+        # A replica may not have the write that just invalidated this entry.
+        from config.db_router import read_from_primary
+
+        with read_from_primary():
+            return fill()
+
+    return get_catalog_cache().get_or_fill(namespace, ident, fill_from_primary)
+
+
+def invalidate(namespace, ident=None):
+    if settings.CATALOG_CACHE_ENABLED:
+        get_catalog_cache().invalidate(namespace, ident)
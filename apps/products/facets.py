@@ -0,0 +1,37 @@
+from django.db import connections, router
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+
+def attribute_facets(category_id):
+    """
+    Return ``{key: [{"value": ..., "count": ...}]}`` over the variants of
+    every product in the category subtree rooted at ``category_id``,
+    counted by a single recursive-CTE query.
+    """
+    connection = connections[router.db_for_read(Variant)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH RECURSIVE subtree AS (
+                SELECT id FROM {Category._meta.db_table} WHERE id = %s
+                UNION ALL
+                SELECT c.id FROM {Category._meta.db_table} c JOIN subtree s ON c.parent_id = s.id
+            )
+            SELECT a.key, a.value, COUNT(*)
+            FROM {Variant._meta.db_table} v
+            JOIN {Product._meta.db_table} p ON p.id = v.product_id
+            JOIN subtree s ON s.id = p.category_id
+            CROSS JOIN LATERAL jsonb_each_text(
+                CASE WHEN jsonb_typeof(v.attributes) = 'object' THEN v.attributes ELSE '{{}}'::jsonb END
+            ) a
+            GROUP BY a.key, a.value
+            ORDER BY a.key, COUNT(*) DESC, a.value
+            """,
+            [category_id],
+        )
+        facets = {}
+        for key, value, count in cursor.fetchall():
+            facets.setdefault(key, []).append({"value": value, "count": count})
+        return facets
@@ -0,0 +1,73 @@
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer # type: ignore
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.products.renderers import ORJSONRenderer
+from apps.products.serializers.fast import FastListSerializer
+from apps.products.serializers.product import ProductSerializer
+from apps.products.serializers.variant import VariantSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Per-row list serialization cost: ModelSerializer + JSONRenderer vs the fast path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        # Seed inside a transaction that is rolled back, so nothing is left behind.
+        try:
+            with transaction.atomic():
+                self.seed(options["rows"])
+                for label, serializer_class, queryset in (
+                    ("products", ProductSerializer, Product.objects.all()),
+                    ("variants", VariantSerializer, Variant.objects.all()),
+                ):
+                    self.compare(label, serializer_class, queryset, options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        category = Category.objects.create(name="bench-serialization")
+        products = Product.objects.bulk_create([
+            Product(
+                name=f"Bench product {i}", description="x" * 400, base_price=Decimal("19.99"),
+                status="active", category=category,
+            )
+            for i in range(rows)
+        ])
+        Variant.objects.bulk_create([
+            Variant(product=product, sku=f"BENCH-SER-{product.id}", attributes={"size": "M", "color": "black"})
+            for product in products
+        ])
+
+    def compare(self, label, serializer_class, queryset, repeat):
+        rows = queryset.count()
+
+        def model_path():
+            return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+        fast = FastListSerializer(serializer_class)
+
+        def fast_path():
+            return ORJSONRenderer().render(fast.serialize(queryset.all()))
+
+        assert model_path() == fast_path(), f"{label}: fast path output differs"
+        for name, path in (("ModelSerializer", model_path), ("fast path", fast_path)):
+            best = min(self.timed(path) for _ in range(repeat))
+            self.stdout.write(f"{label:>9} {name:>16}: {best * 1e6 / rows:7.2f} µs/row ({rows} rows)")
+
+    def timed(self, fn):
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
@@ -0,0 +1,94 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Each run is a fresh interpreter; it prints one line once it is ready.
+WEB = """
+import sys
+from wsgiref.util import setup_testing_defaults
+import config.wsgi
+environ = {"PATH_INFO": sys.argv[1]}
+setup_testing_defaults(environ)
+status = []
+b"".join(config.wsgi.application(environ, lambda code, headers, exc_info=None: status.append(code)))
+print(status[0], "celery loaded" if "celery" in sys.modules else "celery not loaded", flush=True)
+"""
+
+WORKER = """
+import django
+django.setup()
+from config import celery_app
+celery_app.loader.import_default_modules()
+celery_app.finalize(auto=True)
+print(len([name for name in celery_app.tasks if not name.startswith("celery.")]), "tasks", flush=True)
+"""
+
+
+class Command(BaseCommand):
+    help = "Cold start of a web process (to its first response) and a Celery worker (to its tasks loaded)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/categories/", help="Request served by the web process.")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--max-web-seconds", type=float, default=settings.STARTUP_MAX_WEB_SECONDS)
+        parser.add_argument("--max-worker-seconds", type=float, default=settings.STARTUP_MAX_WORKER_SECONDS)
+        parser.add_argument("--profile", type=int, default=15, help="Show the N packages slowest to import in the web process.")
+
+    def handle(self, *args, **options):
+        failed = []
+        for label, script, limit in (
+            ("web", WEB, options["max_web_seconds"]),
+            ("worker", WORKER, options["max_worker_seconds"]),
+        ):
+            timings = []
+            for _ in range(options["repeat"]):
+                seconds, output, _ = self.run(script, options["path"])
+                timings.append(seconds)
+            median = statistics.median(timings)
+            self.stdout.write(
+                f"{label:>6}: median {median * 1000:7.1f} ms, best {min(timings) * 1000:7.1f} ms"
+                f" (limit {limit * 1000:.0f} ms) -> {output}"
+            )
+            if median > limit:
+                failed.append(label)
+
+        if options["profile"]:
+            _, _, stderr = self.run(WEB, options["path"], "-X", "importtime")
+            self.stdout.write("Import time of the web process by package:")
+            for microseconds, package in self.import_time_by_package(stderr, options["profile"]):
+                self.stdout.write(f"{microseconds / 1000:8.1f} ms  {package}")
+
+        if failed:
+            raise CommandError(f"Cold start over the limit: {', '.join(failed)}")
+
+    def run(self, script, path, *flags):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"),
+            # Serve from this process's database (the test database under pytest).
+            "DATABASE_NAME": settings.DATABASES["default"]["NAME"],
+        }
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, *flags, "-c", script, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        seconds = time.perf_counter() - started
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "start-up failed")
+        return seconds, result.stdout.strip(), result.stderr
+
+    def import_time_by_package(self, importtime, count):
+        """Sum the self time (µs) of ``-X importtime`` lines per top-level package."""
+        totals = {}
+        for line in importtime.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            own, _, module = line[len("import time:"):].split("|")
+            package = module.strip().split(".")[0]
+            totals[package] = totals.get(package, 0) + int(own)
+        return sorted(((total, package) for package, total in totals.items()), reverse=True)[:count]
@@ -0,0 +1,24 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.products.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = "Preload pricing rules, categories and hot products/variants into the catalog cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=None, help="Products/variants to preload (CACHE_WARMUP_TOP_N).")
+        parser.add_argument("--budget", type=float, default=None, help="Seconds to spend (CACHE_WARMUP_BUDGET_SECONDS).")
+        parser.add_argument("--hours", type=int, default=None, help="Cart activity window (CACHE_WARMUP_ACTIVITY_HOURS).")
+
+    def handle(self, *args, **options):
+        if not settings.CATALOG_CACHE_ENABLED:
+            self.stdout.write("Catalog cache is disabled (CATALOG_CACHE_ENABLED); nothing to warm.")
+            return
+
+        started = time.monotonic()
+        steps = warm_caches(top_n=options["top"], budget=options["budget"], activity_hours=options["hours"])
+        for step in steps:
+            self.stdout.write(str(step))
+        self.stdout.write(f"{'total':>10}: {time.monotonic() - started:.2f} s")
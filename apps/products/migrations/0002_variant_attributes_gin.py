@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:28
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='variant',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['attributes'], name='variant_attributes_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
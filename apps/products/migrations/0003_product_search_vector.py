@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:29
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_variant_attributes_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE FUNCTION products_product_search_vector(product_id bigint, name text, description text)
+            RETURNS tsvector LANGUAGE sql STABLE AS $$
+                SELECT setweight(to_tsvector('english', coalesce(name, '')), 'A')
+                    || setweight(to_tsvector('simple', coalesce(
+                        (SELECT string_agg(sku, ' ') FROM products_variant WHERE products_variant.product_id = $1), ''
+                    )), 'B')
+                    || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+            $$;
+
+            CREATE FUNCTION products_product_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.search_vector := products_product_search_vector(NEW.id, NEW.name, NEW.description);
+                RETURN NEW;
+            END
+            $$;
+
+            CREATE TRIGGER products_product_search_vector
+            BEFORE INSERT OR UPDATE OF name, description ON products_product
+            FOR EACH ROW EXECUTE FUNCTION products_product_search_vector_trigger();
+
+            CREATE FUNCTION products_variant_search_vector_update() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                -- Only SKU and product changes affect the document.
+                UPDATE products_product
+                SET search_vector = products_product_search_vector(id, name, description)
+                WHERE id IN (
+                    SELECT unnest(ARRAY[n.product_id, o.product_id])
+                    FROM new_rows n JOIN old_rows o ON o.id = n.id
+                    WHERE n.sku IS DISTINCT FROM o.sku OR n.product_id IS DISTINCT FROM o.product_id
+                );
+                RETURN NULL;
+            END
+            $$;
+
+            CREATE FUNCTION products_variant_search_vector_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE products_product
+                SET search_vector = products_product_search_vector(id, name, description)
+                WHERE id IN (SELECT product_id FROM new_rows);
+                RETURN NULL;
+            END
+            $$;
+
+            CREATE FUNCTION products_variant_search_vector_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE products_product
+                SET search_vector = products_product_search_vector(id, name, description)
+                WHERE id IN (SELECT product_id FROM old_rows);
+                RETURN NULL;
+            END
+            $$;
+
+            -- Statement-level with transition tables, so a bulk variant import
+            -- refreshes each affected product once.
+            CREATE TRIGGER products_variant_search_vector_insert
+            AFTER INSERT ON products_variant REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION products_variant_search_vector_insert();
+
+            CREATE TRIGGER products_variant_search_vector_update
+            AFTER UPDATE ON products_variant REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION products_variant_search_vector_update();
+
+            CREATE TRIGGER products_variant_search_vector_delete
+            AFTER DELETE ON products_variant REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION products_variant_search_vector_delete();
+
+            UPDATE products_product SET search_vector = products_product_search_vector(id, name, description);
+            """,
+            reverse_sql="""
+            DROP TRIGGER products_variant_search_vector_delete ON products_variant;
+            DROP TRIGGER products_variant_search_vector_update ON products_variant;
+            DROP TRIGGER products_variant_search_vector_insert ON products_variant;
+            DROP TRIGGER products_product_search_vector ON products_product;
+            DROP FUNCTION products_variant_search_vector_delete();
+            DROP FUNCTION products_variant_search_vector_insert();
+            DROP FUNCTION products_variant_search_vector_update();
+            DROP FUNCTION products_product_search_vector_trigger();
+            DROP FUNCTION products_product_search_vector(bigint, text, text);
+            """,
+        ),
+    ]
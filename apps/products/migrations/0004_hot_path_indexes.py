@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:53
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes to the hot tables.
+    atomic = False
+
+    dependencies = [
+        ('products', '0003_product_search_vector'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['status', 'category'], name='product_status_category'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from .category import Category
 
@@ -12,6 +14,15 @@ class Product(models.Model):
     base_price = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS)
     category = models.ForeignKey(Category, on_delete=models.PROTECT)
+    # Name, description and variant SKUs; maintained by database triggers
+    # (see migration 0003_product_search_vector).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="product_search_vector_gin"),
+            models.Index(fields=["status", "category"], name="product_status_category"),
+        ]
 
     def __str__(self):
         return self.name
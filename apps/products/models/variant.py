@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from .product import Product
 
@@ -7,5 +8,11 @@ class Variant(models.Model):
     attributes = models.JSONField()
     price_adjustment = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    class Meta:
+        indexes = [
+            # jsonb_path_ops serves @> containment lookups on attributes.
+            GinIndex(fields=["attributes"], opclasses=["jsonb_path_ops"], name="variant_attributes_gin"),
+        ]
+
     def __str__(self):
         return self.sku
@@ -0,0 +1,30 @@
+import orjson
+from rest_framework.renderers import JSONRenderer # type: ignore
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer backed by orjson.
+
+    Compact output matches JSONRenderer byte for byte for strings, 64-bit
+    integers and Decimals (already coerced to strings). Floats, e.g. in
+    variant attributes, may be spelled differently (``1e-05`` for
+    ``0.00001``) but decode to the same values. Data orjson cannot encode,
+    such as integers beyond 64 bits, and indented or ASCII-only output fall
+    back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same strict-javascript-subset escaping as JSONRenderer.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
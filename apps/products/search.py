@@ -0,0 +1,51 @@
+import base64
+import json
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from apps.products.models.product import Product
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(rank, pk):
+    return base64.urlsafe_b64encode(json.dumps([rank, pk]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        rank, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def search_products(q, limit, category=None, status=None, after=None):
+    """
+    Rank every product whose search_vector matches ``q`` (websearch syntax)
+    and return ``(page, next_cursor)``. Pages are keyset-paginated on
+    ``(rank, id)`` descending; ``after`` is the cursor of the previous page.
+
+    The GIN index finds the matches; only they are ranked, and the sort
+    keeps just the top ``limit + 1`` rows.
+    """
+    query = SearchQuery(q, search_type="websearch", config="english")
+    # Cast to double precision so the rank handed out in a cursor compares
+    # exactly against the recomputed one.
+    rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+    queryset = Product.objects.defer("search_vector").filter(search_vector=query).annotate(rank=rank)
+    if category is not None:
+        queryset = queryset.filter(category_id=category)
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    if after is not None:
+        after_rank, after_pk = decode_cursor(after)
+        queryset = queryset.filter(Q(rank__lt=after_rank) | Q(rank=after_rank, pk__lt=after_pk))
+
+    page = list(queryset.order_by("-rank", "-pk")[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor(page[-1].rank, page[-1].pk)
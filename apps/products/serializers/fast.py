@@ -0,0 +1,97 @@
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from rest_framework import serializers # type: ignore
+from rest_framework.settings import api_settings # type: ignore
+
+
+def _decimal_converter(field):
+    """Mirror DecimalField.to_representation for values read straight from the DB."""
+    quantum = Decimal(1).scaleb(-field.decimal_places)
+    coerce = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+
+    def convert(value):
+        if value is None:
+            return None
+        value = value.quantize(quantum, rounding=ROUND_HALF_UP)
+        return "{:f}".format(value) if coerce else value
+    return convert
+
+
+def _converter_for(field):
+    # Only fields whose representation is not the raw column value need one.
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    return None
+
+
+def compile_row_converter(names, converters):
+    """
+    Build ``convert(row) -> dict`` for ``values_list`` rows as one generated
+    function, so a row costs a single dict display and no per-field dispatch.
+    """
+    namespace = {}
+    items = []
+    for index, name in enumerate(names):
+        if converters.get(name) is None:
+            items.append(f"{name!r}: row[{index}]")
+        else:
+            namespace[f"convert_{index}"] = converters[name]
+            items.append(f"{name!r}: convert_{index}(row[{index}])")
+    exec(f"def convert(row):\n    return {{{', '.join(items)}}}\n", namespace)
+    return namespace["convert"]
+
+
+class FastListSerializer:
+    """
+    Read-only fast path for a flat ModelSerializer: reads ``values_list`` rows
+    and converts them with a precompiled function instead of building model
+    instances and serializing them field by field.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        serializer_fields = serializer_class().fields
+        self.names = [name for name in serializer_fields if fields is None or name in fields]
+        self.sources = [serializer_fields[name].source for name in self.names]
+        self.convert = compile_row_converter(
+            self.names, {name: _converter_for(serializer_fields[name]) for name in self.names}
+        )
+
+    def serialize(self, queryset):
+        convert = self.convert
+        return [convert(row) for row in queryset.values_list(*self.sources)]
+
+
+class FastCategoryTreeSerializer:
+    """
+    Fast path for CategorySerializer: the whole hierarchy is read in one query
+    and nested in memory instead of one ``children`` query per category.
+    """
+
+    columns = ("id", "name", "parent")
+
+    def __init__(self, fields=None):
+        self.picked = [
+            (index, name) for index, name in enumerate(self.columns) if fields is None or name in fields
+        ]
+        self.with_children = fields is None or "children" in fields
+
+    def serialize(self, queryset):
+        from apps.products.models.category import Category
+
+        picked = self.picked
+        rows = queryset.values_list(*self.columns)
+        if not self.with_children:
+            return [{name: row[index] for index, name in picked} for row in rows]
+
+        children = defaultdict(list)
+        for row in Category.objects.order_by("id").values_list(*self.columns):
+            children[row[2]].append(row)
+
+        # Like CategorySerializer.get_children, nested levels are never trimmed.
+        everything = list(enumerate(self.columns))
+
+        def build(row, picked=everything):
+            data = {name: row[index] for index, name in picked}
+            data["children"] = [build(child) for child in children[row[0]]]
+            return data
+        return [build(row, picked) for row in rows]
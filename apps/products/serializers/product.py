@@ -4,4 +4,4 @@ from apps.products.models.product import Product # type: ignore
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = "__all__"
+        exclude = ["search_vector"]
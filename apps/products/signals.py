@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.pricing.models import PricingRule
+from apps.products import cache
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+
+# Invalidate once the write is visible: dropping the entry inside the
+# writer's transaction would let a concurrent fill re-cache the old row.
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: cache.invalidate("product", pk))
+
+
+@receiver([post_save, post_delete], sender=Variant)
+def invalidate_variant(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: cache.invalidate("variant", pk))
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, instance, **kwargs):
+    # Category details nest their whole subtree, so drop every one of them.
+    transaction.on_commit(lambda: cache.invalidate("category"))
+
+
+@receiver([post_save, post_delete], sender=PricingRule)
+def invalidate_pricing_rules(sender, instance, **kwargs):
+    transaction.on_commit(lambda: cache.invalidate("pricing"))
@@ -0,0 +1,77 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from rest_framework.test import APIClient
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def catalog():
+    clothing = Category.objects.create(name="Clothing")
+    shirts = Category.objects.create(name="Shirts", parent=clothing)
+    shoes = Category.objects.create(name="Shoes")
+
+    def product(name, category, *attributes):
+        product = Product.objects.create(
+            name=name, description="", base_price=Decimal("10.00"), status="active", category=category,
+        )
+        for i, attrs in enumerate(attributes):
+            Variant.objects.create(product=product, sku=f"{name}-{i}", attributes=attrs)
+        return product
+
+    tee = product("Tee", shirts, {"size": "M", "color": "black"}, {"size": "L", "color": "white"})
+    polo = product("Polo", clothing, {"size": "M", "color": "white"})
+    product("Runner", shoes, {"size": "42", "color": "black"})
+    return clothing, tee, polo
+
+def skus(response):
+    return sorted(row["sku"] for row in response.json())
+
+def test_variant_attribute_filters(catalog):
+    client = APIClient()
+
+    assert skus(client.get("/api/variants/?attr.size=M&attr.color=black")) == ["Tee-0"]
+    assert skus(client.get("/api/variants/?attr.size=M&attr.size=L")) == ["Polo-0", "Tee-0", "Tee-1"]
+    assert client.get("/api/variants/?attr.=M").status_code == 400
+
+def test_product_filters_match_a_single_variant(catalog):
+    _, tee, polo = catalog
+    client = APIClient()
+
+    response = client.get("/api/products/?attr.size=M&attr.color=white")
+    assert [row["id"] for row in response.json()] == [polo.id]
+    # Tee has a size M and a white variant, but not a white size M one.
+    assert tee.id not in [row["id"] for row in response.json()]
+
+def test_non_string_values_match_their_facet_text(catalog):
+    _, tee, _ = catalog
+    Variant.objects.create(product=tee, sku="Tee-2", attributes={"size": 42, "waterproof": True})
+    client = APIClient()
+
+    facets = client.get(f"/api/variants/facets/?category={tee.category_id}").json()["facets"]
+    assert {"value": "true", "count": 1} in facets["waterproof"]
+    assert {"value": "42", "count": 1} in facets["size"]
+    assert skus(client.get("/api/variants/?attr.size=42")) == ["Runner-0", "Tee-2"]
+    assert skus(client.get("/api/variants/?attr.waterproof=true")) == ["Tee-2"]
+    assert skus(client.get("/api/variants/?attr.size=42&attr.size=M")) == ["Polo-0", "Runner-0", "Tee-0", "Tee-2"]
+
+def test_facets_count_values_in_category_subtree(catalog, django_assert_num_queries):
+    clothing, _, _ = catalog
+
+    with django_assert_num_queries(1):
+        response = APIClient().get(f"/api/variants/facets/?category={clothing.id}")
+
+    assert response.json()["facets"] == {
+        "color": [{"value": "white", "count": 2}, {"value": "black", "count": 1}],
+        "size": [{"value": "M", "count": 2}, {"value": "L", "count": 1}],
+    }
+    assert APIClient().get("/api/variants/facets/").status_code == 400
+
+def test_attributes_have_a_gin_index():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Variant._meta.db_table)
+
+    assert constraints["variant_attributes_gin"]["type"] == "gin"
@@ -0,0 +1,87 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.cart.models import Cart, CartItem
+from apps.products import cache
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.products.serializers.product import ProductSerializer
+from apps.products.warmup import warm_caches
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def catalog_cache(monkeypatch, settings):
+    settings.CATALOG_CACHE_ENABLED = True
+    remote = LocMemCache("warmup-test", {})
+    remote.clear()
+    two_tier = cache.TwoTierCache(remote)
+    monkeypatch.setattr(cache, "_catalog_cache", two_tier)
+    return two_tier
+
+@pytest.fixture
+def hot_and_cold():
+    category = Category.objects.create(name="Shirts")
+    hot, cold = (
+        Product.objects.create(
+            name=name, description="", base_price=Decimal("10.00"), status="active", category=category,
+        )
+        for name in ("Hot", "Cold")
+    )
+    hot_variant = Variant.objects.create(product=hot, sku="HOT-M", attributes={})
+    Variant.objects.create(product=cold, sku="COLD-M", attributes={})
+    cart = Cart.objects.create(user_id=1)
+    CartItem.objects.create(
+        cart=cart, variant=hot_variant, quantity=1, price_snapshot=Decimal("10.00"),
+        reservation_expires_at=timezone.now() + timedelta(minutes=15),
+    )
+    return category, hot, cold
+
+def test_warm_caches_preloads_hot_details(catalog_cache, hot_and_cold, django_assert_num_queries):
+    category, hot, cold = hot_and_cold
+
+    steps = {step.name: step for step in warm_caches(top_n=10, budget=30)}
+
+    assert steps["products"].warmed == 1
+    assert steps["variants"].warmed == 1
+    assert all(step.complete for step in steps.values())
+    client = APIClient()
+    with django_assert_num_queries(0):
+        client.get(f"/api/products/{hot.id}/")
+        client.get(f"/api/categories/{category.id}/")
+        client.get(f"/api/pricing/{hot.id}/price/")
+    with django_assert_num_queries(1):
+        client.get(f"/api/products/{cold.id}/")
+
+def test_warm_up_reads_from_the_primary(catalog_cache, hot_and_cold, monkeypatch):
+    from config import db_router
+
+    pinned = []
+    serialize = ProductSerializer.to_representation
+
+    def recording(self, instance):
+        pinned.append(db_router._pinned.get())
+        return serialize(self, instance)
+
+    monkeypatch.setattr(ProductSerializer, "to_representation", recording)
+    warm_caches(top_n=10, budget=30)
+
+    assert pinned == [True]
+
+def test_spent_budget_stops_warming(catalog_cache, hot_and_cold):
+    steps = warm_caches(budget=0)
+
+    assert not any(step.complete for step in steps)
+    assert sum(step.warmed for step in steps) == 0
+
+def test_command_reports_timings(catalog_cache, hot_and_cold, capsys):
+    call_command("warm_caches", "--top", "5")
+
+    out = capsys.readouterr().out
+    assert "products: 1 warmed in" in out
+    assert "total:" in out
@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from decimal import Decimal
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.test import APIClient
+from apps.pricing.models import PricingRule
+from apps.products import cache
+from config import db_router
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def catalog_cache(monkeypatch, settings):
+    settings.CATALOG_CACHE_ENABLED = True
+    remote = LocMemCache("catalog-test", {})
+    remote.clear()
+    two_tier = cache.TwoTierCache(remote)
+    monkeypatch.setattr(cache, "_catalog_cache", two_tier)
+    return two_tier
+
+@pytest.fixture
+def product():
+    category = Category.objects.create(name="Shirts")
+    return Product.objects.create(
+        name="T-Shirt", description="Cotton", base_price=Decimal("500.00"),
+        status="active", category=category,
+    )
+
+def test_detail_hits_skip_the_database(catalog_cache, product, django_assert_num_queries):
+    client = APIClient()
+    first = client.get(f"/api/products/{product.id}/").json()
+
+    with django_assert_num_queries(0):
+        assert client.get(f"/api/products/{product.id}/").json() == first
+
+    # A cold local tier is refilled from the shared one.
+    catalog_cache.local.pop(("product", str(product.id)))
+    with django_assert_num_queries(0):
+        assert client.get(f"/api/products/{product.id}/").json() == first
+
+def test_save_invalidates_detail_and_price(catalog_cache, product, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.get(f"/api/products/{product.id}/")
+    client.get(f"/api/pricing/{product.id}/price/")
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        product.base_price = Decimal("400.00")
+        product.save()
+    # Nothing is dropped until the write commits.
+    assert client.get(f"/api/products/{product.id}/").json()["base_price"] == "500.00"
+    for callback in callbacks:
+        callback()
+
+    assert client.get(f"/api/products/{product.id}/").json()["base_price"] == "400.00"
+    assert client.get(f"/api/pricing/{product.id}/price/").json()["final_price"] == 400
+
+def test_pricing_rule_change_bumps_namespace(catalog_cache, product, django_capture_on_commit_callbacks):
+    client = APIClient()
+    assert client.get(f"/api/pricing/{product.id}/price/?quantity=10").json()["final_price"] == 5000
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PricingRule.objects.create(rule_type="BULK", priority=1, config={"min_qty": 10, "discount_percent": 10})
+
+    assert client.get(f"/api/pricing/{product.id}/price/?quantity=10").json()["final_price"] == 4500
+
+def test_concurrent_misses_fill_once(catalog_cache):
+    calls = []
+
+    def fill():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"id": 1}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(catalog_cache.get_or_fill("product", 1, fill)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"id": 1}] * 8
+
+def test_broadcast_invalidation_drops_local_copies(catalog_cache):
+    catalog_cache.get_or_fill("variant", 7, lambda: "old")
+    catalog_cache.remote.clear()
+
+    catalog_cache.apply_invalidation({"namespace": "variant", "ident": "7"})
+
+    assert catalog_cache.get_or_fill("variant", 7, lambda: "new") == "new"
+
+def test_failed_fill_releases_the_fill_lock(catalog_cache):
+    def missing():
+        raise Product.DoesNotExist
+
+    with pytest.raises(Product.DoesNotExist):
+        catalog_cache.get_or_fill("product", 987654, missing)
+
+    started = time.monotonic()
+    with pytest.raises(Product.DoesNotExist):
+        catalog_cache.get_or_fill("product", 987654, missing)
+    assert time.monotonic() - started < 1
+
+    assert APIClient().get("/api/products/987654/").status_code == 404
+    started = time.monotonic()
+    assert APIClient().get("/api/products/987654/").status_code == 404
+    assert time.monotonic() - started < 1
+
+def test_fills_read_from_the_primary(catalog_cache):
+    assert cache.cached("product", 1, db_router._pinned.get) is True
+
+def test_detail_ident_is_normalised(catalog_cache, product):
+    client = APIClient()
+
+    assert client.get(f"/api/products/0{product.id}/").status_code == 200
+    assert ("product", str(product.id)) in catalog_cache.local._data
+    assert client.get("/api/products/abc/").status_code == 404
@@ -0,0 +1,63 @@
+import json
+import pytest
+from decimal import Decimal
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.products.serializers.category import CategorySerializer
+from apps.products.serializers.product import ProductSerializer
+from apps.products.serializers.variant import VariantSerializer
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def catalog():
+    root = Category.objects.create(name="Clothing")
+    child = Category.objects.create(name="Shirts   & tees", parent=root)
+    Category.objects.create(name="Polo", parent=child)
+    product = Product.objects.create(
+        name="T-Shirt é☃", description='Line "one"\nline two ', base_price=Decimal("499.5"),
+        status="active", category=child,
+    )
+    Variant.objects.create(product=product, sku="TS-M", attributes={"size": "M", "tags": ["a", 1, 2.5, None]})
+    Variant.objects.create(product=product, sku="TS-L", attributes={}, price_adjustment=Decimal("-10.25"))
+
+def expected(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+@pytest.mark.parametrize("url, serializer_class, model", [
+    ("/api/products/", ProductSerializer, Product),
+    ("/api/variants/", VariantSerializer, Variant),
+    ("/api/categories/", CategorySerializer, Category),
+])
+def test_fast_list_is_byte_compatible(catalog, url, serializer_class, model):
+    response = APIClient().get(url)
+
+    assert response.status_code == 200
+    assert response.content == expected(serializer_class, model.objects.all())
+
+def test_fast_category_tree_uses_one_query(catalog, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        APIClient().get("/api/categories/")
+
+def test_float_and_big_integer_attributes(catalog):
+    variant = Variant.objects.get(sku="TS-M")
+    variant.attributes = {"ratio": 0.00001, "weight": 1e16, "serial": 2 ** 70}
+    variant.save()
+    client = APIClient()
+
+    listed = client.get("/api/variants/")
+    detail = client.get(f"/api/variants/{variant.id}/")
+
+    assert listed.status_code == detail.status_code == 200
+    assert json.loads(listed.content) == json.loads(expected(VariantSerializer, Variant.objects.all()))
+    assert detail.json()["attributes"] == {"ratio": 0.00001, "weight": 1e16, "serial": 2 ** 70}
+
+def test_float_attributes_decode_to_the_same_values(catalog):
+    Variant.objects.filter(sku="TS-M").update(attributes={"ratio": 0.00001, "weight": 1e16})
+
+    response = APIClient().get("/api/variants/")
+
+    assert json.loads(response.content) == json.loads(expected(VariantSerializer, Variant.objects.all()))
@@ -0,0 +1,86 @@
+import pytest
+from decimal import Decimal
+from rest_framework.test import APIClient
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name="Shirts")
+
+def make_product(category, name, description="", status="active"):
+    return Product.objects.create(
+        name=name, description=description, base_price=Decimal("10.00"), status=status, category=category,
+    )
+
+def search(query):
+    return APIClient().get(f"/api/products/search/?{query}").json()
+
+def test_name_matches_rank_above_description_matches(category):
+    in_description = make_product(category, "Polo", "A linen shirt for summer")
+    in_name = make_product(category, "Linen shirt", "Breathable")
+    make_product(category, "Wool scarf", "Warm")
+
+    response = search("q=linen")
+
+    assert [row["id"] for row in response["results"]] == [in_name.id, in_description.id]
+    assert "search_vector" not in response["results"][0]
+    assert response["next_cursor"] is None
+
+def test_variant_skus_are_searchable_and_kept_up_to_date(category):
+    product = make_product(category, "Tee")
+    variant = Variant.objects.create(product=product, sku="TEE-RED-XL", attributes={})
+
+    assert [row["id"] for row in search("q=TEE-RED-XL")["results"]] == [product.id]
+
+    variant.sku = "TEE-BLUE-XL"
+    variant.save()
+    assert search("q=TEE-RED-XL")["results"] == []
+    assert [row["id"] for row in search("q=TEE-BLUE-XL")["results"]] == [product.id]
+
+    variant.delete()
+    assert search("q=TEE-BLUE-XL")["results"] == []
+
+def test_keyset_pages_cover_all_matches_once(category):
+    expected = {make_product(category, f"Cotton tee {i}", "cotton " * (i % 3)).id for i in range(7)}
+
+    seen, cursor = [], None
+    while True:
+        query = "q=cotton&limit=3" + (f"&cursor={cursor}" if cursor else "")
+        response = search(query)
+        seen += [row["id"] for row in response["results"]]
+        ranks = [row["rank"] for row in response["results"]]
+        assert ranks == sorted(ranks, reverse=True)
+        cursor = response["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(expected)
+
+def test_every_match_is_ranked(category):
+    # More matches than any window would hold, all newer than the best one.
+    best = make_product(category, "Merino wool jumper", "merino wool merino")
+    Product.objects.bulk_create([
+        Product(name=f"Jumper {i}", description="with merino", base_price=Decimal("10.00"), status="active",
+                category=category)
+        for i in range(1500)
+    ])
+
+    response = search("q=merino&limit=5")
+
+    assert response["results"][0]["id"] == best.id
+    assert response["next_cursor"] is not None
+
+def test_filters_and_validation(category):
+    other = Category.objects.create(name="Shoes")
+    shirt = make_product(category, "Canvas shirt")
+    make_product(other, "Canvas shoe")
+    make_product(category, "Canvas jacket", status="archived")
+
+    response = search(f"q=canvas&category={category.id}&status=active")
+    assert [row["id"] for row in response["results"]] == [shirt.id]
+    assert APIClient().get("/api/products/search/").status_code == 400
+    assert APIClient().get("/api/products/search/?q=x&cursor=nope").status_code == 400
@@ -0,0 +1,50 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from apps.cart.models import Cart
+from apps.inventory.models import Inventory
+from apps.pricing.models import PricingRule
+from apps.products.models.product import Product
+from config.db_router import ReadYourWritesMiddleware, ReplicaRouter, read_from_primary
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica1"]
+
+def test_catalog_reads_go_to_replicas(replicas):
+    router = ReplicaRouter()
+
+    assert router.db_for_read(Product) == "replica1"
+    assert router.db_for_read(PricingRule) == "replica1"
+    assert router.db_for_read(Inventory) == "default"
+    assert router.db_for_read(Cart) == "default"
+    assert router.db_for_read(User) == "default"
+    assert router.db_for_read(Session) == "default"
+    assert router.db_for_write(Product) == "default"
+    with read_from_primary():
+        assert router.db_for_read(Product) == "default"
+
+def test_writes_pin_the_client_to_the_primary(replicas, settings):
+    router = ReplicaRouter()
+    seen = []
+
+    def view(request):
+        seen.append(router.db_for_read(Product))
+        return HttpResponse()
+
+    middleware = ReadYourWritesMiddleware(view)
+    factory = RequestFactory()
+
+    response = middleware(factory.post("/api/products/"))
+    cookie = response.cookies[settings.REPLICA_STICKY_COOKIE]
+    assert cookie["max-age"] == settings.REPLICA_STICKY_SECONDS
+
+    sticky = factory.get("/api/products/")
+    sticky.COOKIES[settings.REPLICA_STICKY_COOKIE] = "1"
+    middleware(sticky)
+    middleware(factory.get("/api/products/", HTTP_X_READ_PRIMARY="1"))
+    middleware(factory.get("/api/products/"))
+
+    assert seen == ["default", "default", "default", "replica1"]
@@ -0,0 +1,82 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def product():
+    root = Category.objects.create(name="Clothing")
+    category = Category.objects.create(name="Shirts", parent=root)
+    product = Product.objects.create(
+        name="T-Shirt", description="long text " * 100, base_price=Decimal("500.00"),
+        status="active", category=category,
+    )
+    Variant.objects.create(product=product, sku="TS-M", attributes={"size": "M"})
+    Variant.objects.create(product=product, sku="TS-L", attributes={"size": "L"})
+    return product
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_fields_trim_output_and_columns(product, settings, fast):
+    settings.FAST_LIST_SERIALIZATION = fast
+
+    with CaptureQueriesContext(connection) as queries:
+        response = APIClient().get("/api/products/?fields=id,name,base_price")
+
+    assert response.json() == [{"id": product.id, "name": "T-Shirt", "base_price": "500.00"}]
+    assert "description" not in queries[-1]["sql"]
+
+def test_retrieve_with_fields(product):
+    response = APIClient().get(f"/api/products/{product.id}/?fields=name")
+
+    assert response.json() == {"name": "T-Shirt"}
+
+def test_expand_nests_related_objects_without_n_plus_one(product, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        response = APIClient().get("/api/products/?fields=id&expand=category,variants")
+
+    data = response.json()[0]
+    assert data["category"] == {"id": product.category_id, "name": "Shirts", "parent": product.category.parent_id}
+    assert sorted(variant["sku"] for variant in data["variants"]) == ["TS-L", "TS-M"]
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_naming_an_expandable_field_expands_it(product, settings, fast):
+    settings.FAST_LIST_SERIALIZATION = fast
+    client = APIClient()
+
+    listed = client.get("/api/products/?fields=id,variants").json()[0]
+    retrieved = client.get(f"/api/products/{product.id}/?fields=variants").json()
+
+    for data in (listed, retrieved):
+        assert sorted(variant["sku"] for variant in data["variants"]) == ["TS-L", "TS-M"]
+    assert set(listed) == {"id", "variants"}
+
+def test_variant_fields_skip_attributes(product):
+    response = APIClient().get("/api/variants/?fields=id,sku&expand=product")
+
+    assert set(response.json()[0]) == {"id", "sku", "product"}
+    assert response.json()[0]["product"]["name"] == "T-Shirt"
+
+def test_category_fields(product):
+    response = APIClient().get("/api/categories/?fields=name")
+
+    assert response.json() == [{"name": "Clothing"}, {"name": "Shirts"}]
+
+def test_unknown_fields_are_rejected(product):
+    assert APIClient().get("/api/products/?fields=nope").status_code == 400
+    assert APIClient().get("/api/products/?expand=nope").status_code == 400
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_empty_fields_are_rejected(product, settings, fast):
+    settings.FAST_LIST_SERIALIZATION = fast
+    client = APIClient()
+
+    for url in ("/api/products/?fields=", "/api/products/?fields=,", f"/api/products/{product.id}/?fields="):
+        response = client.get(url)
+        assert response.status_code == 400
+        assert response.json() == {"fields": ["Name at least one field."]}
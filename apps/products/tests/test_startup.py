@@ -0,0 +1,34 @@
+import subprocess
+import sys
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+CHECK = """
+import sys
+import config.wsgi
+from django.urls import resolve
+resolve("/api/cart/add/")
+print(sorted(name for name in ("celery", "redis") if name in sys.modules))
+from apps.cart.tasks import process_checkout_jobs
+from config import celery_app
+print(process_checkout_jobs.app is celery_app, celery_app.main)
+"""
+
+def test_web_process_loads_celery_only_when_tasks_are_used():
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.splitlines() == ["[]", "True config"]
+
+@pytest.mark.django_db
+def test_bench_startup_reports_both_processes(capsys, monkeypatch):
+    # The children serve from the test database, whatever the environment says.
+    monkeypatch.setenv("DATABASE_NAME", "missing")
+    call_command("bench_startup", "--repeat", "1", "--profile", "3", "--max-web-seconds", "60", "--max-worker-seconds", "60")
+
+    out = capsys.readouterr().out
+    assert "200 OK celery not loaded" in out
+    assert "worker: median" in out
+    assert "django" in out
@@ -1,8 +1,17 @@
 from rest_framework.viewsets import ModelViewSet
 from apps.products.models.category import Category
-from apps.products.serializers.category import CategorySerializer
+from apps.products.serializers.category import CategoryBriefSerializer, CategorySerializer
+from apps.products.serializers.fast import FastCategoryTreeSerializer
+from .mixins import CachedRetrieveMixin, FastListMixin, SparseFieldsetMixin
 
 
-class CategoryViewSet(ModelViewSet):
+class CategoryViewSet(CachedRetrieveMixin, SparseFieldsetMixin, FastListMixin, ModelViewSet):
     queryset = Category.objects.all()
+    cache_namespace = "category"
     serializer_class = CategorySerializer
+    expandable = {
+        "parent": (CategoryBriefSerializer, False),
+    }
+
+    def get_fast_list_serializer(self):
+        return FastCategoryTreeSerializer(fields=self.get_requested_fields())
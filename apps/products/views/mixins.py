@@ -0,0 +1,186 @@
+from functools import lru_cache
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.lookups import In
+from django.http import Http404
+from rest_framework.exceptions import ValidationError # type: ignore
+from rest_framework.renderers import BrowsableAPIRenderer # type: ignore
+from rest_framework.response import Response # type: ignore
+from apps.products import cache
+from apps.products.renderers import ORJSONRenderer
+from apps.products.serializers.fast import FastListSerializer
+
+
+@lru_cache(maxsize=128)
+def _fast_list_serializer(serializer_class, fields):
+    return FastListSerializer(serializer_class, fields=fields)
+
+
+class FastListMixin:
+    """
+    Serve ``list`` from ``values_list`` rows through a precompiled converter
+    (see apps.products.serializers.fast), rendered with orjson. Output
+    decodes to the same data as the ModelSerializer path (see
+    ORJSONRenderer for float spelling), which stays in use for paginated
+    lists and when FAST_LIST_SERIALIZATION is off.
+    """
+
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        if not self.can_use_fast_list():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(self.get_fast_list_serializer().serialize(queryset))
+
+    def can_use_fast_list(self):
+        return settings.FAST_LIST_SERIALIZATION and self.paginator is None
+
+    def get_requested_fields(self):
+        return None
+
+    def get_fast_list_serializer(self):
+        fields = self.get_requested_fields()
+        return _fast_list_serializer(self.serializer_class, tuple(fields) if fields else None)
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=id,name`` trims the representation and defers the other columns
+    with ``only()``; ``?expand=rel`` nests the related object(s) listed in
+    ``expandable`` (``{name: (serializer_class, many)}``) and loads them with
+    ``select_related``/``prefetch_related``; naming one in ``fields``
+    expands it too. Applies to list and retrieve.
+    """
+
+    expandable = {}
+
+    def _query_param_list(self, name):
+        if self.action not in ("list", "retrieve"):
+            return None
+        raw = self.request.query_params.get(name)
+        if raw is None:
+            return None
+        return [value.strip() for value in raw.split(",") if value.strip()]
+
+    def get_requested_expansions(self):
+        expand = self._query_param_list("expand") or []
+        unknown = [name for name in expand if name not in self.expandable]
+        if unknown:
+            raise ValidationError({"expand": [f"Cannot expand: {', '.join(unknown)}"]})
+        fields = self._query_param_list("fields") or []
+        return expand + [name for name in fields if name in self.expandable and name not in expand]
+
+    def get_requested_fields(self):
+        fields = self._query_param_list("fields")
+        if fields is None:
+            return None
+        if not fields:
+            raise ValidationError({"fields": ["Name at least one field."]})
+        available = set(self.serializer_class().fields) | set(self.expandable)
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ValidationError({"fields": [f"Unknown fields: {', '.join(unknown)}"]})
+        return fields + [name for name in self.get_requested_expansions() if name not in fields]
+
+    def can_use_fast_list(self):
+        return not self.get_requested_expansions() and super().can_use_fast_list()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        expand = self.get_requested_expansions()
+
+        if fields is not None:
+            model_fields = {field.name: field for field in queryset.model._meta.concrete_fields}
+            serializer_fields = self.serializer_class().fields
+            columns = []
+            for name in fields:
+                source = serializer_fields[name].source if name in serializer_fields else name
+                if source in model_fields:
+                    columns.append(source)
+            queryset = queryset.only(*columns)
+
+        for name in expand:
+            _, many = self.expandable[name]
+            queryset = queryset.prefetch_related(name) if many else queryset.select_related(name)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_requested_fields()
+        expand = self.get_requested_expansions()
+        if fields is None and not expand:
+            return serializer
+
+        target = getattr(serializer, "child", serializer)
+        for name in expand:
+            serializer_class, many = self.expandable[name]
+            target.fields[name] = serializer_class(many=many, read_only=True)
+        if fields is not None:
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+
+class CachedRetrieveMixin:
+    """
+    Serve the default ``retrieve`` representation through the two-tier
+    catalog cache (apps.products.cache) under ``cache_namespace``; requests
+    with query parameters (sparse fieldsets, expansions) bypass it.
+    """
+
+    cache_namespace = None
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+
+        # Same key for "01" and "1", and the one invalidation deletes.
+        try:
+            ident = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise Http404
+        data = cache.cached(
+            self.cache_namespace, ident, lambda: dict(self.get_serializer(self.get_object()).data)
+        )
+        return Response(data)
+
+
+class AttributeFilterMixin:
+    """
+    ``?attr.size=M&attr.color=black`` keeps rows whose variant attributes
+    contain every listed key; repeating a key (``attr.size=M&attr.size=L``)
+    accepts any of its values. Values compare as text (``->>``), the way
+    apps.products.facets reports them, so ``attr.size=42`` matches a
+    numeric 42 and ``attr.waterproof=true`` a boolean.
+    """
+
+    attribute_prefix = "attr."
+
+    def get_attribute_filter(self):
+        if self.action != "list":
+            return None
+        condition = Q()
+        for param in self.request.query_params:
+            if not param.startswith(self.attribute_prefix):
+                continue
+            key = param[len(self.attribute_prefix):]
+            if not key:
+                raise ValidationError({param: ["Attribute name is required."]})
+            values = self.request.query_params.getlist(param)
+            condition &= Q(In(KeyTextTransform(key, "attributes"), values))
+        return condition or None
+
+    def filter_by_attributes(self, queryset, condition):
+        return queryset.filter(condition)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        condition = self.get_attribute_filter()
+        if condition is not None:
+            queryset = self.filter_by_attributes(queryset, condition)
+        return queryset
@@ -1,7 +1,52 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from rest_framework.decorators import action # type: ignore
+from rest_framework.exceptions import ValidationError # type: ignore
+from rest_framework.response import Response # type: ignore
 from rest_framework.viewsets import ModelViewSet # type: ignore
 from apps.products.models.product import Product # type: ignore
+from apps.products.models.variant import Variant
+from apps.products.search import InvalidCursor, search_products
+from apps.products.serializers.category import CategoryBriefSerializer
 from apps.products.serializers.product import ProductSerializer
+from apps.products.serializers.variant import VariantSerializer
+from .mixins import AttributeFilterMixin, CachedRetrieveMixin, FastListMixin, SparseFieldsetMixin
 
-class ProductViewSet(ModelViewSet):
-    queryset = Product.objects.all()
+class ProductViewSet(AttributeFilterMixin, CachedRetrieveMixin, SparseFieldsetMixin, FastListMixin, ModelViewSet):
+    queryset = Product.objects.defer("search_vector")
+    cache_namespace = "product"
     serializer_class = ProductSerializer
+    expandable = {
+        "category": (CategoryBriefSerializer, False),
+        "variants": (VariantSerializer, True),
+    }
+
+    def filter_by_attributes(self, queryset, condition):
+        # All requested attributes must match on the same variant.
+        return queryset.filter(Exists(Variant.objects.filter(condition, product=OuterRef("pk"))))
+
+    @action(detail=False)
+    def search(self, request):
+        params = request.query_params
+        q = params.get("q", "").strip()
+        if not q:
+            raise ValidationError({"q": ["A search query is required."]})
+        try:
+            limit = min(int(params.get("limit", settings.PRODUCT_SEARCH_PAGE_SIZE)), settings.PRODUCT_SEARCH_MAX_PAGE_SIZE)
+        except ValueError:
+            raise ValidationError({"limit": ["Must be an integer."]})
+        category = params.get("category")
+        if category is not None and not category.isdigit():
+            raise ValidationError({"category": ["Must be a category id."]})
+
+        try:
+            page, cursor = search_products(
+                q, max(limit, 1), category=category, status=params.get("status"), after=params.get("cursor"),
+            )
+        except InvalidCursor:
+            raise ValidationError({"cursor": ["Invalid cursor."]})
+
+        results = self.get_serializer(page, many=True).data
+        for row, product in zip(results, page):
+            row["rank"] = product.rank
+        return Response({"results": results, "next_cursor": cursor})
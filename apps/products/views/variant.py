@@ -1,8 +1,25 @@
+from rest_framework.decorators import action # type: ignore
+from rest_framework.exceptions import ValidationError # type: ignore
+from rest_framework.response import Response # type: ignore
 from rest_framework.viewsets import ModelViewSet # type: ignore
+from apps.products.facets import attribute_facets
 from apps.products.models.variant import Variant
+from apps.products.serializers.product import ProductSerializer
 from apps.products.serializers.variant import VariantSerializer
+from .mixins import AttributeFilterMixin, CachedRetrieveMixin, FastListMixin, SparseFieldsetMixin
 
 
-class VariantViewSet(ModelViewSet):
+class VariantViewSet(AttributeFilterMixin, CachedRetrieveMixin, SparseFieldsetMixin, FastListMixin, ModelViewSet):
     queryset = Variant.objects.all()
+    cache_namespace = "variant"
     serializer_class = VariantSerializer
+    expandable = {
+        "product": (ProductSerializer, False),
+    }
+
+    @action(detail=False)
+    def facets(self, request):
+        category = request.query_params.get("category")
+        if category is None or not category.isdigit():
+            raise ValidationError({"category": ["A category id is required."]})
+        return Response({"category": int(category), "facets": attribute_facets(int(category))})
@@ -0,0 +1,100 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+from apps.cart.models import CartItem
+from apps.pricing.engine import get_active_rules
+from apps.products import cache
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.models.variant import Variant
+from apps.products.serializers.category import CategorySerializer
+from apps.products.serializers.product import ProductSerializer
+from apps.products.serializers.variant import VariantSerializer
+from config.db_router import read_from_primary
+
+
+class WarmupStep:
+    def __init__(self, name):
+        self.name = name
+        self.warmed = 0
+        self.seconds = 0.0
+        self.complete = True
+
+    def __str__(self):
+        line = f"{self.name:>10}: {self.warmed} warmed in {self.seconds * 1000:.1f} ms"
+        if not self.complete:
+            line += " (stopped, time budget spent)"
+        return line
+
+
+def hot_ids(field, top_n, since):
+    """Ids behind the most cart lines whose hold started after ``since``."""
+    return list(
+        CartItem.objects.filter(reservation_expires_at__gte=since)
+        .values_list(field, flat=True)
+        .annotate(lines=Count("id"))
+        .order_by("-lines")[:top_n]
+    )
+
+
+def _warm_details(step, namespace, serializer_class, objects, deadline):
+    for obj in objects:
+        if time.monotonic() >= deadline:
+            step.complete = False
+            return
+        cache.cached(namespace, obj.pk, lambda obj=obj: dict(serializer_class(obj).data))
+        step.warmed += 1
+
+
+def warm_caches(top_n=None, budget=None, activity_hours=None):
+    """
+    Preload the catalog cache (both tiers) with the active pricing rules,
+    every category detail and the product/variant details with the most
+    recent cart activity. Steps run in that order until ``budget`` seconds
+    are spent; returns one WarmupStep per step.
+    """
+    top_n = settings.CACHE_WARMUP_TOP_N if top_n is None else top_n
+    budget = settings.CACHE_WARMUP_BUDGET_SECONDS if budget is None else budget
+    activity_hours = settings.CACHE_WARMUP_ACTIVITY_HOURS if activity_hours is None else activity_hours
+    deadline = time.monotonic() + budget
+    since = timezone.now() - timedelta(hours=activity_hours)
+
+    steps = []
+
+    def run(name, load):
+        step = WarmupStep(name)
+        steps.append(step)
+        started = time.monotonic()
+        if started >= deadline:
+            step.complete = False
+        else:
+            # The rows to serialize come from the primary, like every fill.
+            with read_from_primary():
+                load(step)
+        step.seconds = time.monotonic() - started
+
+    def pricing(step):
+        step.warmed = len(get_active_rules())
+
+    def categories(step):
+        # Parents first, so a short budget still covers the top of the tree.
+        objects = list(Category.objects.order_by("parent_id", "id").prefetch_related("children"))
+        _warm_details(step, "category", CategorySerializer, objects, deadline)
+
+    def products(step):
+        ids = hot_ids("variant__product_id", top_n, since)
+        objects = Product.objects.in_bulk(ids)
+        _warm_details(step, "product", ProductSerializer, [objects[i] for i in ids if i in objects], deadline)
+
+    def variants(step):
+        ids = hot_ids("variant_id", top_n, since)
+        objects = Variant.objects.in_bulk(ids)
+        _warm_details(step, "variant", VariantSerializer, [objects[i] for i in ids if i in objects], deadline)
+
+    run("pricing", pricing)
+    run("categories", categories)
+    run("products", products)
+    run("variants", variants)
+    return steps
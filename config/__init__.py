@@ -1,3 +1,11 @@
-from .celery import app as celery_app
-
+# The Celery app is created on first use, so web processes and management
+# commands that never touch it do not pay for importing Celery. Task modules
+# import config.celery themselves, which binds their shared tasks to it.
 __all__ = ("celery_app",)
+
+
+def __getattr__(name):
+    if name == "celery_app":
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,72 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+
+# Only catalog and pricing reads may lag; everything else (inventory and cart
+# reads feed locking writes; auth and sessions must see the last login) stays
+# on the primary.
+REPLICA_APPS = {"products", "pricing"}
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_pinned = ContextVar("read_primary", default=False)
+
+
+@contextmanager
+def read_from_primary():
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReplicaRouter:
+    """Send catalog and pricing reads to replicas; everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or _pinned.get() or model._meta.app_label not in REPLICA_APPS:
+            return "default"
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins reads to the primary for the rest of a write request and, through a
+    short-lived cookie, for the client's next REPLICA_STICKY_SECONDS. Clients
+    without cookies can send the X-Read-Primary header instead.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writing = request.method not in SAFE_METHODS
+        pinned = (
+            writing
+            or settings.REPLICA_STICKY_COOKIE in request.COOKIES
+            or "HTTP_X_READ_PRIMARY" in request.META
+        )
+        token = _pinned.set(pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+
+        if writing:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, "1",
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax",
+            )
+        return response
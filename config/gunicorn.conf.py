@@ -0,0 +1,37 @@
+# gunicorn -c config/gunicorn.conf.py config.wsgi
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+# Availability streams (SSE) stay open indefinitely: each one holds a
+# thread, not a whole worker, and the worker heartbeat keeps running while
+# it does, so the timeout only catches workers that really hang.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "32"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+
+
+def post_fork(server, worker):
+    """Warm the catalog cache in each worker before it takes traffic."""
+    if os.environ.get("WARM_CACHES_ON_FORK", "1") != "1":
+        return
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.db import connections
+
+    if not settings.CATALOG_CACHE_ENABLED:
+        return
+    from apps.products.warmup import warm_caches
+
+    try:
+        for step in warm_caches():
+            server.log.info("worker %s cache warm-up %s", worker.pid, str(step).strip())
+    except Exception:
+        # A cold cache is slower, not broken; never keep a worker from booting.
+        server.log.exception("worker %s cache warm-up failed", worker.pid)
+    finally:
+        connections.close_all()
@@ -14,6 +14,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     "rest_framework",
 
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "config.db_router.ReadYourWritesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -52,7 +54,7 @@ TEMPLATES = [
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
-        "NAME": "ecommerce",
+        "NAME": os.environ.get("DATABASE_NAME", "ecommerce"),
         "USER": "postgres",
         "PASSWORD": "postgres",
         "HOST": "db",
@@ -60,6 +62,20 @@ DATABASES = {
     }
 }
 
+# Comma-separated replica hosts, e.g. DATABASE_REPLICA_HOSTS=db-replica-1,db-replica-2.
+# Pointing one at the primary host is enough to exercise the routing locally.
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.environ.get("DATABASE_REPLICA_HOSTS", "").split(",")), start=1):
+    alias = f"replica{index}"
+    DATABASES[alias] = {**DATABASES["default"], "HOST": host.strip(), "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+
+# After a write, the client's reads stay on the primary for this long.
+REPLICA_STICKY_COOKIE = "read_primary"
+REPLICA_STICKY_SECONDS = 5
+
 TIME_ZONE = "UTC"
 USE_TZ = True
 
@@ -69,6 +85,120 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 CELERY_BROKER_URL = "redis://redis:6379/0"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+CELERY_RESULT_BACKEND = "redis://redis:6379/0"
+# tasks/ is not an installed app, so autodiscovery does not find it.
+CELERY_IMPORTS = ("tasks.inventory_cleanup",)
+CELERY_BEAT_SCHEDULE = {
+    "compact-inventory-ledger": {
+        "task": "apps.inventory.tasks.compact_inventory_ledger",
+        "schedule": 60.0,
+    },
+    "maintain-reservation-partitions": {
+        "task": "apps.cart.tasks.maintain_reservation_partitions",
+        "schedule": 60.0,
+    },
+}
+
+# "database" keeps active carts in Cart/CartItem, "redis" keeps them in Redis
+# until checkout.
+CART_STORE = os.environ.get("CART_STORE", "database")
+CART_REDIS_URL = os.environ.get("CART_REDIS_URL", "redis://redis:6379/1")
+
+# Async checkout queues a CheckoutJob and lets Celery workers commit pending
+# checkouts for the same variants in groups of up to CHECKOUT_GROUP_SIZE.
+CHECKOUT_ASYNC = os.environ.get("CHECKOUT_ASYNC", "0") == "1"
+CHECKOUT_GROUP_SIZE = 100
+
+# Reservations for the same variant arriving within this many milliseconds
+# are merged into one locked UPDATE (0 disables coalescing).
+INVENTORY_RESERVATION_COALESCE_MS = float(os.environ.get("INVENTORY_RESERVATION_COALESCE_MS", "0"))
+
+# Ledger mode records stock changes as InventoryMovement rows; available stock
+# is the Inventory snapshot plus pending movements until compaction folds them.
+INVENTORY_LEDGER = os.environ.get("INVENTORY_LEDGER", "0") == "1"
+
+# Keep reservation holds in cart_reservationhold, range-partitioned by expiry,
+# so expired holds are released per partition and the partition is dropped.
+RESERVATION_HOLDS_PARTITIONED = os.environ.get("RESERVATION_HOLDS_PARTITIONED", "0") == "1"
+RESERVATION_HOLD_PARTITION_MINUTES = 5
+RESERVATION_HOLD_PARTITIONS_AHEAD = 6
+
+# Record each hold's deadline in a Redis sorted set so run_expiry_scheduler can
+# release it within a second of expiry instead of waiting for the next scan.
+RESERVATION_EXPIRY_SCHEDULER = os.environ.get("RESERVATION_EXPIRY_SCHEDULER", "0") == "1"
+RESERVATION_EXPIRY_REDIS_URL = os.environ.get("RESERVATION_EXPIRY_REDIS_URL", CART_REDIS_URL)
+
+# release_expired_reservations_sharded splits expired holds into at least
+# CLEANUP_WORKERS disjoint variant ranges of at most CLEANUP_CHUNK_SIZE variants.
+CLEANUP_WORKERS = int(os.environ.get("CLEANUP_WORKERS", "4"))
+CLEANUP_CHUNK_SIZE = int(os.environ.get("CLEANUP_CHUNK_SIZE", "1000"))
+
+# NOTIFY INVENTORY_EVENTS_CHANNEL with each variant's new available quantity
+# when stock changes; /api/inventory/stream/ relays them to clients over SSE,
+# at most once per variant per INVENTORY_EVENTS_INTERVAL seconds.
+INVENTORY_EVENTS = os.environ.get("INVENTORY_EVENTS", "0") == "1"
+INVENTORY_EVENTS_CHANNEL = "inventory_availability"
+INVENTORY_EVENTS_INTERVAL = float(os.environ.get("INVENTORY_EVENTS_INTERVAL", "1"))
+INVENTORY_STREAM_HEARTBEAT = 15
+INVENTORY_STREAM_MAX_VARIANTS = 100
+
+# /api/inventory/availability/ answers from the database ("strict") or from a
+# per-process snapshot ("snapshot") that is patched by the events above and
+# fully reloaded once it may be INVENTORY_SNAPSHOT_MAX_AGE seconds stale.
+INVENTORY_AVAILABILITY_MODE = os.environ.get("INVENTORY_AVAILABILITY_MODE", "strict")
+INVENTORY_AVAILABILITY_MAX_VARIANTS = 500
+INVENTORY_SNAPSHOT_MAX_AGE = int(os.environ.get("INVENTORY_SNAPSHOT_MAX_AGE", "30"))
+
+# Bulk stock adjustments (/api/inventory/adjustments/, adjust_inventory) lock
+# and update INVENTORY_ADJUST_CHUNK_SIZE variants per transaction.
+INVENTORY_ADJUST_CHUNK_SIZE = 500
+INVENTORY_ADJUST_MAX_RECORDS = 10000
+
+# Serve product/variant/category lists through the values_list + orjson fast path.
+FAST_LIST_SERIALIZATION = os.environ.get("FAST_LIST_SERIALIZATION", "1") == "1"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_REDIS_URL", "redis://redis:6379/2"),
+    }
+}
+
+# Product/variant/category details and the active pricing rules are read
+# through apps.products.cache: a per-process LRU (entries trusted for
+# CATALOG_CACHE_LOCAL_TTL seconds) in front of the shared Redis cache.
+# Writes invalidate both tiers and are broadcast on CATALOG_CACHE_CHANNEL.
+CATALOG_CACHE_ENABLED = os.environ.get("CATALOG_CACHE_ENABLED", "1") == "1"
+CATALOG_CACHE_TTL = 300
+CATALOG_CACHE_LOCAL_MAX_ENTRIES = 10000
+CATALOG_CACHE_LOCAL_TTL = 5
+CATALOG_CACHE_CHANNEL = "catalog-cache-invalidation"
+
+# warm_caches (and the gunicorn post_fork hook) preload the catalog cache:
+# pricing rules, categories and the CACHE_WARMUP_TOP_N products/variants with
+# the most cart lines over the last CACHE_WARMUP_ACTIVITY_HOURS.
+CACHE_WARMUP_TOP_N = int(os.environ.get("CACHE_WARMUP_TOP_N", "200"))
+CACHE_WARMUP_ACTIVITY_HOURS = 24
+CACHE_WARMUP_BUDGET_SECONDS = float(os.environ.get("CACHE_WARMUP_BUDGET_SECONDS", "10"))
+
+# PRICING_TRACE records each pricing rule's matches, discounts and evaluation
+# time (/api/pricing/stats/; ?trace=1 on a price request returns its trace,
+# for staff users or under DEBUG). PRICING_SHADOW_ENGINE, a dotted path to a
+# PricingEngine subclass, is run in the background on
+# PRICING_SHADOW_SAMPLE_RATE of price calculations and differences are logged;
+# samples are dropped while PRICING_SHADOW_MAX_PENDING runs are queued.
+PRICING_TRACE = os.environ.get("PRICING_TRACE", "0") == "1"
+PRICING_SHADOW_ENGINE = os.environ.get("PRICING_SHADOW_ENGINE", "")
+PRICING_SHADOW_SAMPLE_RATE = float(os.environ.get("PRICING_SHADOW_SAMPLE_RATE", "0.01"))
+PRICING_SHADOW_MAX_PENDING = 100
+
+PRODUCT_SEARCH_PAGE_SIZE = 20
+PRODUCT_SEARCH_MAX_PAGE_SIZE = 100
+
+# bench_startup fails when the median cold start of a web process (to its first
+# response) or a Celery worker (to its tasks loaded) exceeds these.
+STARTUP_MAX_WEB_SECONDS = float(os.environ.get("STARTUP_MAX_WEB_SECONDS", "2.5"))
+STARTUP_MAX_WORKER_SECONDS = float(os.environ.get("STARTUP_MAX_WORKER_SECONDS", "3"))
 
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
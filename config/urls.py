@@ -8,4 +8,5 @@ urlpatterns = [
     path("api/categories/", include("apps.products.urls_categories")),
     path("api/pricing/", include("apps.pricing.urls")),
     path("api/cart/", include("apps.cart.urls")),
+    path("api/inventory/", include("apps.inventory.urls")),
 ]
@@ -1,18 +1,102 @@
-from celery import shared_task # type: ignore
+import logging
+import math
+import time
+from datetime import datetime
+from celery import chord, shared_task # type: ignore
+import config.celery # noqa: F401  (binds the shared tasks to the project app)
+from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
 from apps.cart.models import CartItem
-from apps.inventory.models import Inventory
+from apps.cart import holds
+from apps.cart.services import release_cart_items
+from apps.cart.stores import get_cart_store
+
+RELEASE_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
 
 @shared_task
 def release_expired_reservations():
+    if holds.partitioning_enabled():
+        # Holds are the source of truth; expired CartItems go with their partition.
+        holds.release_expired()
+        get_cart_store().release_expired()
+        return
+
+    # Safety net for holds the expiry scheduler missed (or all holds when it
+    # is disabled).
     expired = CartItem.objects.filter(reservation_expires_at__lt=timezone.now())
+    expired_ids = list(expired.values_list("id", flat=True))
+    for start in range(0, len(expired_ids), RELEASE_BATCH_SIZE):
+        release_cart_items(expired_ids[start:start + RELEASE_BATCH_SIZE])
+
+    get_cart_store().release_expired()
 
-    for item in expired:
-        with transaction.atomic():
-            inventory = Inventory.objects.select_for_update().get(
-                variant=item.variant
-            )
-            inventory.reserved_quantity -= item.quantity
-            inventory.save()
-            item.delete()
+
+def shard_ranges(variant_ids, workers, chunk_size):
+    """
+    Split sorted variant ids into disjoint inclusive ``(first, last)`` ranges.
+
+    Ranges hold at most ``chunk_size`` variants and there are at least
+    ``workers`` of them when there are enough variants to go round.
+    """
+    if not variant_ids:
+        return []
+    size = max(1, min(chunk_size, math.ceil(len(variant_ids) / workers)))
+    return [
+        (variant_ids[i], variant_ids[min(i + size, len(variant_ids)) - 1])
+        for i in range(0, len(variant_ids), size)
+    ]
+
+@shared_task
+def release_expired_reservations_sharded():
+    """Fan expired reservations out to workers by disjoint variant-id range."""
+    if holds.partitioning_enabled():
+        return release_expired_reservations()
+
+    cutoff = timezone.now()
+    variant_ids = sorted(set(
+        CartItem.objects.filter(reservation_expires_at__lt=cutoff).values_list("variant_id", flat=True)
+    ))
+    ranges = shard_ranges(variant_ids, settings.CLEANUP_WORKERS, settings.CLEANUP_CHUNK_SIZE)
+    get_cart_store().release_expired()
+    if not ranges:
+        return 0
+
+    shards = [release_expired_range.s(first, last, cutoff.isoformat()) for first, last in ranges]
+    chord(shards)(record_cleanup_stats.s(time.time()))
+    return len(shards)
+
+@shared_task
+def release_expired_range(first_variant_id, last_variant_id, cutoff):
+    started = time.perf_counter()
+    expired_ids = list(
+        CartItem.objects.filter(
+            variant_id__gte=first_variant_id,
+            variant_id__lte=last_variant_id,
+            reservation_expires_at__lt=datetime.fromisoformat(cutoff),
+        ).order_by("variant_id").values_list("id", flat=True)
+    )
+
+    released = 0
+    for start in range(0, len(expired_ids), RELEASE_BATCH_SIZE):
+        released += release_cart_items(expired_ids[start:start + RELEASE_BATCH_SIZE])
+    return {
+        "range": [first_variant_id, last_variant_id],
+        "released": released,
+        "seconds": time.perf_counter() - started,
+    }
+
+@shared_task
+def record_cleanup_stats(results, started_at):
+    elapsed = time.time() - started_at
+    released = sum(result["released"] for result in results)
+    stats = {
+        "shards": len(results),
+        "released": released,
+        "seconds": round(elapsed, 3),
+        "items_per_second": round(released / elapsed, 1) if elapsed else None,
+        "slowest_shard_seconds": round(max(result["seconds"] for result in results), 3),
+    }
+    logger.info("Sharded reservation cleanup finished: %s", stats)
+    return stats